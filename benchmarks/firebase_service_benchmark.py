@@ -0,0 +1,162 @@
+"""
+Offline throughput/latency benchmark for the Firebase service.
+
+Runs FirebaseService on an InMemoryFirestoreClient, so the service's own code (chunked batch commits,
+hydration, the read-through cache, change tracking) is measured without credentials or network and
+can run in CI:
+
+    python -m benchmarks.firebase_service_benchmark --sizes 1000 10000 100000 --latency 0.002
+    python -m benchmarks.firebase_service_benchmark --trusted --cache --track-changes
+
+For every collection size it reports ops/sec, p50/p99 latency and round trips per call of add,
+fetch_by_id, fetch_all, update and the batch paths.
+"""
+import argparse
+import json
+import random
+import time
+from typing import Callable, Dict, List
+from google.cloud.firestore_v1.base_query import FieldFilter
+from common.models.project import PublicationCreative, PublicationCreativeStatus
+from common.services.firebase.firebase_cache import FirebaseModelCache
+from common.services.firebase.firebase_hydrator import FirebaseHydrator
+from common.services.firebase.firebase_service import FirebaseService
+from common.services.firebase.in_memory_firestore import InMemoryFirestoreClient
+
+BATCH_SIZE = 500
+PUBLICATIONS = 100
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def measure(name: str, calls: int, op: Callable[[int], int], client: InMemoryFirestoreClient) -> Dict[str, float]:
+    """
+    Call `op(i)` `calls` times. `op` returns the number of documents it touched.
+    """
+    latencies = []
+    docs = 0
+    round_trips = client.round_trips
+    started = time.perf_counter()
+    for i in range(calls):
+        t0 = time.perf_counter()
+        docs += op(i)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    return {
+        "op": name,
+        "calls": calls,
+        "ops_per_sec": calls / elapsed if elapsed else float("inf"),
+        "docs_per_sec": docs / elapsed if elapsed else float("inf"),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "rpcs_per_call": (client.round_trips - round_trips) / calls if calls else 0.0,
+    }
+
+
+def creative(i: int) -> PublicationCreative:
+    return PublicationCreative(
+        publication_id=f"pub-{i % PUBLICATIONS}",
+        user_id=f"user-{i % 10}",
+        status=PublicationCreativeStatus.new,
+        file_name=f"creative-{i}.mp4",
+    )
+
+
+def run(service: FirebaseService, client: InMemoryFirestoreClient, size: int, single_ops: int, scans: int) -> List[Dict[str, float]]:
+    results = []
+    rng = random.Random(size)
+
+    # Fill the collection through the batch path
+    ids: List[str] = []
+    batches = [[creative(i) for i in range(start, min(start + BATCH_SIZE, size))] for start in range(0, size, BATCH_SIZE)]
+
+    def batch_add(i):
+        ids.extend(obj.id for obj in service.batch_add(batches[i]))
+        return len(batches[i])
+    results.append(measure("batch_add", len(batches), batch_add, client))
+
+    def add(i):
+        ids.append(service.add(creative(size + i)).id)
+        return 1
+    results.append(measure("add", single_ops, add, client))
+
+    def fetch_by_id(i):
+        return int(service.fetch_by_id(PublicationCreative, rng.choice(ids)) is not None)
+    results.append(measure("fetch_by_id", single_ops, fetch_by_id, client))
+
+    def update(i):
+        obj = PublicationCreative(id=rng.choice(ids), status=PublicationCreativeStatus.generating)
+        service.update(obj.id, obj)
+        return 1
+    results.append(measure("update", single_ops, update, client))
+
+    def fetch_and_update(i):
+        # With --track-changes only the changed field is sent
+        obj = service.fetch_by_id(PublicationCreative, rng.choice(ids))
+        obj.status = PublicationCreativeStatus.done
+        service.update(obj.id, obj)
+        return 1
+    results.append(measure("fetch+update", single_ops, fetch_and_update, client))
+
+    filters = [FieldFilter("publication_id", "==", "pub-0")]
+    results.append(measure("fetch_all(filtered)", scans, lambda i: len(service.fetch_all(PublicationCreative, filters)), client))
+    results.append(measure("fetch_all", scans, lambda i: len(service.fetch_all(PublicationCreative)), client))
+
+    update_batches = [
+        [PublicationCreative(id=doc_id, status=PublicationCreativeStatus.done) for doc_id in ids[start:start + BATCH_SIZE]]
+        for start in range(0, len(ids), BATCH_SIZE)
+    ]
+    results.append(measure("batch_update", len(update_batches), lambda i: len(service.batch_update(update_batches[i])), client))
+
+    delete_batches = [ids[start:start + BATCH_SIZE] for start in range(0, len(ids), BATCH_SIZE)]
+
+    def batch_delete(i):
+        service.batch_delete(PublicationCreative, delete_batches[i])
+        return len(delete_batches[i])
+    results.append(measure("batch_delete", len(delete_batches), batch_delete, client))
+
+    for result in results:
+        result["size"] = size
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="Collection sizes to benchmark")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated round-trip time in seconds")
+    parser.add_argument("--single-ops", type=int, default=1_000, help="Calls per single-document operation")
+    parser.add_argument("--scans", type=int, default=5, help="Calls per full collection scan")
+    parser.add_argument("--trusted", action="store_true", help="Hydrate with a trusted FirebaseHydrator")
+    parser.add_argument("--cache", action="store_true", help="Enable the read-through FirebaseModelCache")
+    parser.add_argument("--track-changes", action="store_true", help="Only send changed fields of loaded objects")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        client = InMemoryFirestoreClient(latency=args.latency)
+        service = FirebaseService(
+            api_key="",
+            database_id="",
+            cache=FirebaseModelCache() if args.cache else None,
+            hydrator=FirebaseHydrator(trusted=args.trusted),
+            track_changes=args.track_changes,
+            client=client
+        )
+        results.extend(run(service, client, size, args.single_ops, args.scans))
+        service.close_db()
+
+    print(f"{'size':>8} {'op':<20} {'calls':>7} {'ops/sec':>12} {'docs/sec':>12} {'p50 ms':>9} {'p99 ms':>9} {'rpcs/call':>10}")
+    for r in results:
+        print(f"{r['size']:>8} {r['op']:<20} {r['calls']:>7} {r['ops_per_sec']:>12.1f} {r['docs_per_sec']:>12.1f} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['rpcs_per_call']:>10.2f}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compares the default hydration of Firestore snapshots (`to_dict()` copy + validation) with trusted
+hydration (no copy + `construct_model`, optionally validating a sample) for typical documents:
+
+    python -m benchmarks.hydration_benchmark --docs 20000
+"""
+import argparse
+import time
+from typing import Any, Dict, List, Type
+from google.auth.credentials import AnonymousCredentials
+from google.cloud.firestore_v1 import Client, DocumentReference, DocumentSnapshot
+from pydantic import BaseModel
+from common.models.export import TTExport
+from common.models.project import Reading
+from common.services.firebase.firebase_hydrator import FirebaseHydrator
+
+# Only used to build document references; never contacted
+_CLIENT = Client(project="benchmark", credentials=AnonymousCredentials())
+
+
+def reading_doc(i: int) -> Dict[str, Any]:
+    return {
+        "id": f"reading-{i}",
+        "user_id": "user-1",
+        "project_id": "project-1",
+        "script_id": f"script-{i}",
+        "type": "video",
+        "info": {"platform": "heygen", "avatar_id": "avatar-1", "voice_id": "voice-1", "avatar_name": "Anna"},
+        "duration": 31.5,
+        "status": "done",
+        "assets": [
+            {
+                "id": f"asset-{i}-{j}",
+                "user_id": "user-1",
+                "project_id": "project-1",
+                "name": f"{j}.mp4",
+                "type": "video_reading",
+                "path": f"users/user-1/{j}.mp4",
+                "url": f"https://storage.example.com/{j}.mp4",
+                "content_type": "video/mp4",
+                "size": 1024.0 * j,
+                "metadata": {"width": 720, "height": 1280},
+            }
+            for j in range(5)
+        ],
+    }
+
+
+def tt_export_doc(i: int) -> Dict[str, Any]:
+    return {
+        "id": f"export-{i}",
+        "user_id": "user-1",
+        "publication_id": f"publication-{i}",
+        "campaign_name": "Campaign",
+        "ad_creatives_in_adgroup_count": 3,
+        "pixel_id": "pixel-1",
+        "pixel_event": "Purchase",
+        "locations": ["US", "CA", "GB"],
+        "languages": ["en"],
+        "budget": 100.0,
+        "bid_min": 0.5,
+        "bid_max": 1.5,
+        "identity_id": "identity-1",
+        "url": "https://example.com/?t=YYYYYYY",
+        "event_name": "purchase",
+        "file_names": [f"creative-{j}.mp4" for j in range(30)],
+        "ad_titles": [f"Title {j}" for j in range(10)],
+    }
+
+
+def snapshot(data: Dict[str, Any]) -> DocumentSnapshot:
+    doc_id = data.pop("id")
+    reference = DocumentReference("benchmark", doc_id, client=_CLIENT)
+    return DocumentSnapshot(reference, data, exists=True, read_time=None, create_time=None, update_time=None)
+
+
+def bench(hydrator: FirebaseHydrator, model_class: Type[BaseModel], docs: List[DocumentSnapshot]) -> float:
+    # Same steps as FirebaseService._to_model
+    started = time.perf_counter()
+    for doc in docs:
+        data = hydrator.read(doc)
+        data["id"] = doc.id
+        hydrator.hydrate(model_class, data)
+    return len(docs) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20_000, help="Documents hydrated per mode")
+    parser.add_argument("--validate-every", type=int, default=100, help="Sampling rate of the sampled mode")
+    args = parser.parse_args()
+
+    cases: List[tuple] = [(Reading, reading_doc), (TTExport, tt_export_doc)]
+    modes: List[tuple] = [
+        ("validated", lambda: FirebaseHydrator()),
+        ("trusted", lambda: FirebaseHydrator(trusted=True)),
+        (f"trusted 1/{args.validate_every}", lambda: FirebaseHydrator(trusted=True, validate_every=args.validate_every)),
+    ]
+
+    print(f"{'model':<10} {'mode':<18} {'docs/sec':>12} {'speedup':>8}")
+    for model_class, make_doc in cases:
+        docs = [snapshot(make_doc(i)) for i in range(args.docs)]
+        baseline = None
+        for name, make_hydrator in modes:
+            rate = bench(make_hydrator(), model_class, docs)
+            baseline = baseline or rate
+            print(f"{model_class.__name__:<10} {name:<18} {rate:>12.0f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Import-time benchmark of the common package, checked against benchmarks/import_time_budget.json.
+
+Every module is imported in a fresh interpreter with `python -X importtime`; the cumulative time of
+the module is compared with its budget (median of --runs) and the heavy SDKs listed as forbidden
+must not have been imported:
+
+    python -m benchmarks.import_time --runs 5
+
+Exits with status 1 when a budget is exceeded, so it can run in CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BUDGET_PATH = os.path.join(os.path.dirname(__file__), "import_time_budget.json")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Prints the modules loaded by the import; -X importtime writes its report to stderr
+PROBE = "import sys, {module}; print('\\n'.join(sys.modules))"
+
+
+def measure(module: str) -> Tuple[float, List[str]]:
+    """
+    Import `module` in a new interpreter. Returns its cumulative import time in ms and the loaded modules.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module)],
+        capture_output=True, text=True, cwd=ROOT, check=True
+    )
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1])
+    return cumulative_us / 1000, result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module; the median is compared")
+    parser.add_argument("--budget", default=BUDGET_PATH, help="Budget file")
+    args = parser.parse_args()
+
+    with open(args.budget) as f:
+        budgets: Dict[str, dict] = json.load(f)
+
+    failures = []
+    print(f"{'module':<50} {'median ms':>10} {'budget ms':>10}  heavy imports")
+    for module, budget in budgets.items():
+        timings = []
+        loaded: List[str] = []
+        for _ in range(args.runs):
+            elapsed, loaded = measure(module)
+            timings.append(elapsed)
+        median = statistics.median(timings)
+        heavy = [name for name in budget.get("forbidden", []) if name in loaded]
+        print(f"{module:<50} {median:>10.1f} {budget['max_ms']:>10}  {', '.join(heavy) or '-'}")
+        if median > budget["max_ms"]:
+            failures.append(f"{module}: {median:.1f} ms exceeds the {budget['max_ms']} ms budget")
+        if heavy:
+            failures.append(f"{module}: imports {', '.join(heavy)}")
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Offline throughput benchmark of collection export/import (NDJSON and, with pyarrow, Parquet).
+
+Exports a collection populated in an InMemoryFirestoreClient through FirebaseService and imports it into an empty one:
+
+    python -m benchmarks.transfer_benchmark --docs 50000
+"""
+import argparse
+import os
+import tempfile
+from typing import Callable, List
+from common.models.project import Reading
+from common.services.firebase.firebase_exporter import FirebaseExporter
+from common.services.firebase.firebase_importer import FirebaseImporter
+from common.services.firebase.firebase_transfer import FirebaseTransferProgress
+from common.services.firebase.firebase_service import BATCH_WRITE_LIMIT, FirebaseService
+from common.services.firebase.in_memory_firestore import InMemoryFirestoreClient
+from benchmarks.hydration_benchmark import reading_doc
+
+
+def in_memory_service() -> FirebaseService:
+    return FirebaseService(api_key="", database_id="", client=InMemoryFirestoreClient())
+
+
+def populate(client: InMemoryFirestoreClient, docs: int):
+    collection = client.collection(Reading.collection_name())
+    for start in range(0, docs, BATCH_WRITE_LIMIT):
+        batch = client.batch()
+        for i in range(start, min(start + BATCH_WRITE_LIMIT, docs)):
+            data = reading_doc(i)
+            batch.set(collection.document(data.pop("id")), data)
+        batch.commit()
+
+
+def report(name: str, run: Callable[[], FirebaseTransferProgress], size: Callable[[], int]):
+    progress = run()
+    print(f"{name:<16} {progress.documents:>10} {progress.docs_per_sec:>12.0f} {size() / 1024 / 1024:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=50_000, help="Documents in the exported collection")
+    parser.add_argument("--page-size", type=int, default=500, help="Documents per exported page")
+    args = parser.parse_args()
+
+    source = in_memory_service()
+    populate(source.db, args.docs)
+    exporter = FirebaseExporter(source, page_size=args.page_size)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ndjson_path = os.path.join(tmp, "readings.ndjson.gz")
+        parquet_path = os.path.join(tmp, "readings")
+
+        def directory_size() -> int:
+            return sum(os.path.getsize(os.path.join(parquet_path, name)) for name in os.listdir(parquet_path))
+
+        cases: List[tuple] = [
+            ("export ndjson", lambda: exporter.export_ndjson(Reading, ndjson_path), lambda: os.path.getsize(ndjson_path)),
+            ("import ndjson", lambda: FirebaseImporter(in_memory_service()).import_ndjson(Reading, ndjson_path), lambda: os.path.getsize(ndjson_path)),
+        ]
+        try:
+            import pyarrow  # noqa: F401
+            cases += [
+                ("export parquet", lambda: exporter.export_parquet(Reading, parquet_path), directory_size),
+                ("import parquet", lambda: FirebaseImporter(in_memory_service()).import_parquet(Reading, parquet_path), directory_size),
+            ]
+        except ImportError:
+            print("pyarrow is not installed: skipping Parquet")
+
+        print(f"{'case':<16} {'docs':>10} {'docs/sec':>12} {'MB':>10}")
+        for name, run, size in cases:
+            report(name, run, size)
+
+
+if __name__ == "__main__":
+    main()
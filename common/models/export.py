@@ -2,15 +2,16 @@ import io, csv
 import random
 from urllib.parse import quote  # URL-encoding
 from math import ceil
-from openpyxl import Workbook, load_workbook
-from openpyxl.worksheet.worksheet import Worksheet
-from openpyxl.utils import get_column_letter
 from datetime import datetime, timedelta
-from typing import List, ClassVar, Optional
+from typing import TYPE_CHECKING, List, ClassVar, Optional
 from pydantic import Field
 from decimal import Decimal, ROUND_HALF_UP
 from common.services.firebase.firebase_object import FirebaseObject
 
+# openpyxl is only imported when a spreadsheet is built
+if TYPE_CHECKING:
+    from openpyxl.worksheet.worksheet import Worksheet
+
 
 class TTExport(FirebaseObject):
 
@@ -53,6 +54,9 @@ class TTExport(FirebaseObject):
     ]
     
     def get_xlsx(self) -> bytes:
+        from openpyxl import Workbook
+        from openpyxl.utils import get_column_letter
+
         rows = self._build_bulk_rows()
 
         wb = Workbook()
@@ -72,10 +76,12 @@ class TTExport(FirebaseObject):
         return output.getvalue()
 
     def get_xlsx_from_template(self, sheet_name: Optional[str] = None) -> bytes:
+        from openpyxl import load_workbook
+
         rows = self._build_bulk_rows()
 
         wb = load_workbook("./media/exports/tt_template.xlsx", data_only=False)
-        ws: Worksheet = self._pick_sheet(wb, "Creogen")
+        ws: "Worksheet" = self._pick_sheet(wb, "Creogen")
 
         header_row_idx, col_map = self._find_header_row_and_mapping(ws, self.ALL_FIELDS)
         if header_row_idx is None:
@@ -108,7 +114,7 @@ class TTExport(FirebaseObject):
             groups.append(files[start:end])
         return groups, N_actual
 
-    def _pick_sheet(self, wb, sheet_name: Optional[str]) -> Worksheet:
+    def _pick_sheet(self, wb, sheet_name: Optional[str]) -> "Worksheet":
         if sheet_name and sheet_name in wb.sheetnames:
             return wb[sheet_name]
         for name in wb.sheetnames:
@@ -116,7 +122,7 @@ class TTExport(FirebaseObject):
                 return wb[name]
         return wb.active
 
-    def _find_header_row_and_mapping(self, ws: Worksheet, fields: List[str]) -> tuple[Optional[int], dict]:
+    def _find_header_row_and_mapping(self, ws: "Worksheet", fields: List[str]) -> tuple[Optional[int], dict]:
         best_row = None
         best_map = {}
         for row_idx in range(1, min(ws.max_row, 50) + 1):
@@ -133,7 +139,7 @@ class TTExport(FirebaseObject):
                     break
         return best_row, best_map
 
-    def _detect_first_append_row(self, ws: Worksheet, header_row_idx: int, key_col: Optional[int]) -> int:
+    def _detect_first_append_row(self, ws: "Worksheet", header_row_idx: int, key_col: Optional[int]) -> int:
         if key_col is None:
             return ws.max_row + 1
         first_data_row = header_row_idx + 1
@@ -1,7 +1,7 @@
 import os, uuid
 from enum import Enum
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import ClassVar, List, Optional, Dict
 from pydantic import BaseModel, Field
 from common.services.firebase.firebase_object import FirebaseObject
 
@@ -94,6 +94,9 @@ class ReadingAvatarInfo(BaseModel):
     
 
 class Reading(FirebaseObject):
+    STATE_FIELD: ClassVar[Optional[str]] = "status"
+    UPDATED_AT_FIELD: ClassVar[Optional[str]] = "updated_at"
+
     user_id: Optional[str] = None
     project_id: Optional[str] = None
     script_id: Optional[str] = None
@@ -147,6 +150,9 @@ class PublicationCreativeStatus(str, Enum):
 
 
 class PublicationCreative(FirebaseObject):
+    STATE_FIELD: ClassVar[Optional[str]] = "status"
+    UPDATED_AT_FIELD: ClassVar[Optional[str]] = "updated_at"
+
     publication_id: Optional[str] = None
     user_id: Optional[str] = None
     status: PublicationCreativeStatus = PublicationCreativeStatus.new
@@ -159,6 +165,9 @@ class PublicationCreative(FirebaseObject):
     
 
 class Publication(FirebaseObject):
+    STATE_FIELD: ClassVar[Optional[str]] = "phase"
+    UPDATED_AT_FIELD: ClassVar[Optional[str]] = "updated_at"
+
     user_id: Optional[str] = None
     project_id: Optional[str] = None
     script_id: str
@@ -227,6 +236,23 @@ class PublicationStatus(BaseModel):
     creatives_ready: int
     creatives_total: int
     creatives_statuses: dict[str, PublicationCreativeStatus] = Field(default_factory=dict)
+    creatives_status_counts: dict[PublicationCreativeStatus, int] = Field(default_factory=dict)
+
+    @classmethod
+    def from_counts(cls, publication: Publication, counts: dict[PublicationCreativeStatus, int]) -> "PublicationStatus":
+        """
+        Build the status from per-status creative counts (e.g. FirebaseService.count_by over all
+        PublicationCreativeStatus members), without loading the creatives themselves. The counts must include
+        creatives at the default status, which are stored without a status field.
+        """
+        counts = {PublicationCreativeStatus(status): count for status, count in counts.items()}
+        return cls(
+            publication_id=publication.id,
+            publication_status=publication.phase,
+            creatives_ready=counts.get(PublicationCreativeStatus.done, 0),
+            creatives_total=sum(counts.values()),
+            creatives_status_counts=counts,
+        )
     
     @property
     def progress(self) -> float:
@@ -255,13 +281,20 @@ class PublicationStatus(BaseModel):
         weight = 1.0 / total
         contrib = 0.0
 
-        for status in self.creatives_statuses.values():
+        # Если известны только количества по статусам (from_counts) — считаем по ним
+        counts = self.creatives_status_counts
+        if not counts:
+            counts = {}
+            for status in self.creatives_statuses.values():
+                counts[status] = counts.get(status, 0) + 1
+
+        for status, count in counts.items():
             if status == PublicationCreativeStatus.done:
-                contrib += weight
+                contrib += weight * count
             elif status == PublicationCreativeStatus.creating_subtitles:
-                contrib += weight / 3.0
+                contrib += weight / 3.0 * count
             elif status == PublicationCreativeStatus.generating:
-                contrib += weight / 2.0
+                contrib += weight / 2.0 * count
             # для других статусов вклад = 0
 
         # Ограничиваем максимальным 1.0
@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import json
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Callable, List, Type, Optional
+from common.services.firebase.firebase_service_exception import FirebaseServiceException
+from common.services.firebase.async_firebase_service_interface import AsyncFirebaseServiceInterface
+from common.services.firebase.firebase_object import FirebaseObject
+from common.services.firebase.firebase_service import BATCH_WRITE_LIMIT, DEFAULT_BATCH_CONCURRENCY
+from common.services.firebase.firebase_timestamps import stamped
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1 import AsyncClient
+    from google.cloud.firestore_v1.async_batch import AsyncWriteBatch
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+# asyncio Firebase service implementation backed by the Firestore AsyncClient
+class AsyncFirebaseService(AsyncFirebaseServiceInterface):
+    def __init__(self, api_key: str, database_id: str):
+        self._db: Optional[AsyncClient] = None
+        self._api_key = api_key
+        self._database_id = database_id
+
+    @property
+    def db(self) -> AsyncClient:
+        """
+        Firestore async client, created on first use.
+        """
+        if self._db is None:  # No await in between: safe within one event loop
+            self._db = self.__initialize(api_key=self._api_key, database_id=self._database_id)
+        return self._db
+
+    def __initialize(self, api_key: str, database_id: str) -> AsyncClient:
+        """
+        Initialize Firebase Admin SDK with the service account key from the environment.
+        """
+        import firebase_admin
+        from firebase_admin import credentials, firestore_async
+
+        if not firebase_admin._apps:  # Check if Firebase app is already initialized
+            # If you're using the raw JSON string, load it as a dictionary
+            cred_dict = json.loads(api_key)
+            cred = credentials.Certificate(cred_dict)
+            firebase_admin.initialize_app(cred)
+
+        # Initialize Firestore async client
+        return firestore_async.client(database_id=database_id)
+
+    async def add(self, obj: FirebaseObject) -> FirebaseObject:
+        """
+        Add an object to the specified Firestore collection.
+
+        :param obj: The object to be added to Firestore.
+        :return: The object with the assigned document ID.
+        """
+        try:
+            collection_ref = self.db.collection(obj.collection_name())
+            _, doc_ref = await collection_ref.add(stamped(obj, obj.model_dump(exclude_unset=True)))
+            obj.id = doc_ref.id
+            return obj
+        except Exception as e:
+            raise FirebaseServiceException(f"Failed to add document to {obj.collection_name()}: {str(e)}")
+
+    async def add_with_doc_id(self, doc_id: str, obj: FirebaseObject) -> FirebaseObject:
+        """
+        Add an object to the specified Firestore collection with specific document ID.
+
+        :param doc_id: The document ID to store the object under.
+        :param obj: The object to be added to Firestore.
+        :return: The stored object.
+        """
+        try:
+            doc_ref = self.db.collection(obj.collection_name()).document(doc_id)
+            await doc_ref.set(stamped(obj, obj.model_dump(exclude_unset=True)))
+            return obj
+        except Exception as e:
+            raise FirebaseServiceException(f"Failed to add document to {obj.collection_name()}: {str(e)}")
+
+    async def delete(self, model_class: Type[FirebaseObject], doc_id: str):
+        """
+        Delete an object by its document ID from the specified Firestore collection.
+
+        :param model_class: The class corresponding to the collection where the document is located.
+        :param doc_id: The document ID of the object to delete.
+        """
+        try:
+            doc_ref = self.db.collection(model_class.collection_name()).document(doc_id)
+            await doc_ref.delete()
+        except Exception as e:
+            raise FirebaseServiceException(f"Failed to delete document: {str(e)}")
+
+    async def fetch_all(self, model_class: Type[FirebaseObject], filters: Optional[List[FieldFilter]] = None) -> List[FirebaseObject]:
+        """
+        Fetch all documents from a specified Firestore collection and convert them into objects of type `model_class`.
+
+        :param model_class: The class to which the documents should be mapped (e.g., User, Product).
+        :param filters: Optional list of filters to apply to the query.
+        :return: A list of objects of type `model_class`.
+        """
+        try:
+            query = self.db.collection(model_class.collection_name())
+            for filter in filters or []:
+                query = query.where(filter=filter)
+
+            objects = []
+            async for doc in query.stream():
+                data = doc.to_dict()
+                data["id"] = doc.id  # Include the document ID
+                objects.append(model_class(**data))
+
+            return objects
+
+        except Exception as e:
+            raise FirebaseServiceException(f"Error fetching documents from {model_class.collection_name()}: {str(e)}")
+
+    async def fetch_by_id(self, model_class: Type[FirebaseObject], doc_id: str) -> Optional[FirebaseObject]:
+        """
+        Fetch a single document by its ID and convert it into an object of the specified model class.
+
+        :param model_class: The class to which the document should be mapped (e.g., User).
+        :param doc_id: Document ID of the Firestore document to retrieve.
+        :return: An object of type `model_class` or None if the document does not exist.
+        """
+        try:
+            doc_ref = self.db.collection(model_class.collection_name()).document(doc_id)
+            doc = await doc_ref.get()
+
+            if not doc.exists:  # Document does not exist
+                return None
+
+            data = doc.to_dict()
+            data["id"] = doc.id  # Include the Firestore document ID in the data
+            return model_class(**data)
+        except Exception as e:
+            raise FirebaseServiceException(f"Error fetching document from {model_class.collection_name()}: {e}")
+
+    async def fetch_one(self, model_class: Type[FirebaseObject], filters: Optional[List[FieldFilter]]) -> Optional[FirebaseObject]:
+        """
+        Fetch a single document matching the filters and convert it into an object of type `model_class`.
+
+        :param model_class: The class to which the document should be mapped (e.g., User, Product).
+        :param filters: Optional list of filters to apply to the query.
+        :return: An object of type `model_class` or None if no document matches the query.
+        """
+
+        try:
+            query = self.db.collection(model_class.collection_name())
+            for filter in filters or []:
+                query = query.where(filter=filter)
+
+            # Two documents are enough to tell that the filters are not unique
+            objects = []
+            async for doc in query.limit(2).stream():
+                data = doc.to_dict()
+                data["id"] = doc.id  # Include the document ID
+                objects.append(model_class(**data))
+        except Exception as e:
+            raise FirebaseServiceException(f"Error fetching documents from {model_class.collection_name()}: {str(e)}")
+
+        if not objects:
+            return None
+
+        if len(objects) != 1:
+            raise FirebaseServiceException(f"Expected one document, but found more than one in {model_class.collection_name()}.")
+
+        return objects[0]
+
+    async def update(self, id: str, obj: FirebaseObject) -> FirebaseObject:
+        """
+        Update an existing document in the specified Firestore collection by its ID.
+
+        :param id: The ID of the document to update.
+        :param obj: The object to update the document with (should be a Pydantic model).
+        :return: The data written to the document, including its ID.
+        """
+        try:
+            doc_ref = self.db.collection(obj.collection_name()).document(id)
+            data = obj.model_dump(exclude_unset=True)  # Exclude unset fields
+            await doc_ref.set(stamped(obj, dict(data)), merge=True)  # merge=True will update only the fields provided
+
+            data["id"] = id
+            return data
+
+        except Exception as e:
+            raise FirebaseServiceException(f"Error updating document with ID {id}: {str(e)}")
+
+    async def add_to_subcollection(
+        self,
+        parent_collection: Type[FirebaseObject],
+        parent_id: str,
+        obj: FirebaseObject
+    ) -> str:
+        """
+        Add an object to a subcollection of a parent document in Firestore.
+
+        :param parent_collection: The parent collection class where the subcollection exists.
+        :param parent_id: The ID of the parent document.
+        :param obj: The object to be added to the subcollection.
+        :return: The document ID of the added object in the subcollection.
+        """
+        try:
+            parent_ref = self.db.collection(parent_collection.collection_name()).document(parent_id)
+            subcol_ref = parent_ref.collection(obj.collection_name())
+            _, doc_ref = await subcol_ref.add(stamped(obj, obj.model_dump(exclude_unset=True)))
+            return doc_ref.id
+        except Exception as e:
+            raise FirebaseServiceException(
+                f"Adding subcollection failure {obj.collection_name()} "
+                f"document {parent_collection.collection_name()}/{parent_id}: {e}"
+            )
+
+    async def batch_add(self, objs: List[FirebaseObject], concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> List[FirebaseObject]:
+        """
+        Add multiple objects to Firestore in batch operations.
+        Objects are split into batches of at most 500 writes, committed concurrently.
+
+        :param objs: List of FirebaseObject instances to add.
+        :param concurrency: Maximum number of batches committed at the same time.
+        :return: List of FirebaseObject instances with assigned document IDs.
+        """
+        try:
+            writes = []
+            updated_objs = []
+            for obj in objs:
+                doc_ref = self.db.collection(obj.collection_name()).document()  # auto-generated ID
+                writes.append(lambda batch, ref=doc_ref, data=stamped(obj, obj.model_dump(exclude_unset=True)): batch.set(ref, data))
+                obj.id = doc_ref.id
+                updated_objs.append(obj)
+            await self._commit_in_chunks(writes, concurrency)
+            return updated_objs
+        except Exception as e:
+            raise FirebaseServiceException(f"Batch add failed: {str(e)}")
+
+    async def batch_update(self, objs: List[FirebaseObject], concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> List[FirebaseObject]:
+        """
+        Update multiple documents in Firestore using batch operations.
+        Each object must have an 'id' field set.
+        Objects are split into batches of at most 500 writes, committed concurrently.
+
+        :param objs: List of FirebaseObject instances to update.
+        :param concurrency: Maximum number of batches committed at the same time.
+        :return: List of updated FirebaseObject instances.
+        """
+        try:
+            writes = []
+            updated_objs = []
+            for obj in objs:
+                if not obj.id:
+                    raise FirebaseServiceException("Each object must have an ID for batch update.")
+                doc_ref = self.db.collection(obj.collection_name()).document(obj.id)
+                writes.append(lambda batch, ref=doc_ref, data=stamped(obj, obj.model_dump(exclude_unset=True)): batch.set(ref, data, merge=True))
+                updated_objs.append(obj)
+            await self._commit_in_chunks(writes, concurrency)
+            return updated_objs
+        except Exception as e:
+            raise FirebaseServiceException(f"Batch update failed: {str(e)}")
+
+    async def batch_delete(self, model_class: Type[FirebaseObject], doc_ids: List[str], concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> None:
+        """
+        Delete multiple documents in Firestore using batch operations.
+        Deletes are split into batches of at most 500 writes, committed concurrently.
+
+        :param model_class: The class corresponding to the collection where documents are located.
+        :param doc_ids: List of document IDs to be deleted.
+        :param concurrency: Maximum number of batches committed at the same time.
+        :return: None.
+        """
+        try:
+            writes = []
+            for doc_id in doc_ids:
+                doc_ref = self.db.collection(model_class.collection_name()).document(doc_id)
+                writes.append(lambda batch, ref=doc_ref: batch.delete(ref))
+            await self._commit_in_chunks(writes, concurrency)
+            logger.info("Deleted %d documents from %s", len(doc_ids), model_class.collection_name())
+
+        except Exception as e:
+            raise FirebaseServiceException(f"Batch delete failed: {str(e)}")
+
+    async def _commit_in_chunks(self, writes: List[Callable[[AsyncWriteBatch], None]], concurrency: int) -> None:
+        """
+        Apply queued writes in batches of at most BATCH_WRITE_LIMIT operations and commit them concurrently.
+        Batches are atomic individually, not as a whole.
+
+        :param writes: Callables adding one write each to the given batch.
+        :param concurrency: Maximum number of batches committed at the same time.
+        """
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def commit(chunk):
+            async with semaphore:
+                batch = self.db.batch()
+                for write in chunk:
+                    write(batch)
+                await batch.commit()
+
+        await asyncio.gather(*(
+            commit(writes[i:i + BATCH_WRITE_LIMIT]) for i in range(0, len(writes), BATCH_WRITE_LIMIT)
+        ))
+
+    async def close_db(self):
+        """
+        Close the Firestore database connection, if it was opened.
+        """
+        if self._db is not None:
+            self._db.close()
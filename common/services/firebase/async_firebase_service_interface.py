@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, List, Type, Optional
+from common.services.firebase.firebase_object import FirebaseObject
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+# Abstract base class for asyncio Firebase service
+class AsyncFirebaseServiceInterface(ABC):
+
+    @abstractmethod
+    async def add(self, obj: FirebaseObject) -> FirebaseObject:
+        pass
+
+    @abstractmethod
+    async def add_with_doc_id(self, doc_id: str, obj: FirebaseObject) -> FirebaseObject:
+        pass
+
+    @abstractmethod
+    async def delete(self, model_class: Type[FirebaseObject], doc_id: str):
+        pass
+
+    @abstractmethod
+    async def fetch_all(self, model_class: Type[FirebaseObject], filters: Optional[List[FieldFilter]] = None) -> List[FirebaseObject]:
+        pass
+
+    @abstractmethod
+    async def fetch_by_id(self, model_class: Type[FirebaseObject], doc_id: str) -> Optional[FirebaseObject]:
+        pass
+
+    @abstractmethod
+    async def fetch_one(self, model_class: Type[FirebaseObject], filters: Optional[List[FieldFilter]]) -> Optional[FirebaseObject]:
+        pass
+
+    @abstractmethod
+    async def update(self, id: str, obj: FirebaseObject) -> FirebaseObject:
+        pass
+
+    @abstractmethod
+    async def add_to_subcollection(self, parent_collection: Type[FirebaseObject], parent_id: str, obj: FirebaseObject) -> str:
+        pass
+
+    @abstractmethod
+    async def batch_add(self, objs: List[FirebaseObject]) -> List[FirebaseObject]:
+        pass
+
+    @abstractmethod
+    async def batch_update(self, objs: List[FirebaseObject]) -> List[FirebaseObject]:
+        pass
+
+    @abstractmethod
+    async def batch_delete(self, model_class: Type[FirebaseObject], doc_ids: List[str]) -> None:
+        pass
+
+    @abstractmethod
+    async def close_db(self):
+        pass
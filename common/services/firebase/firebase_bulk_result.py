@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Optional
+
+# Per-document outcome of a bulk write operation
+class FirebaseBulkWriteResult(BaseModel):
+    collection: str
+    doc_id: str
+    success: bool
+    error: Optional[str] = None
+    attempts: int = 1
@@ -0,0 +1,82 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple, Type
+from common.services.firebase.firebase_object import FirebaseObject
+
+# Read-through cache of hydrated models, keyed by (collection name, document ID).
+# Entries expire after a per-model-class TTL; the least recently used entry is evicted when full.
+class FirebaseModelCache:
+    def __init__(self, max_size: int = 1024, default_ttl: float = 60.0, ttls: Optional[Dict[Type[FirebaseObject], float]] = None):
+        """
+        :param max_size: Maximum number of cached documents.
+        :param default_ttl: Time to live in seconds for model classes without an explicit TTL.
+        :param ttls: Per-model-class TTL in seconds. A TTL of 0 disables caching for that class.
+        """
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.ttls = {model_class.collection_name(): ttl for model_class, ttl in (ttls or {}).items()}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, FirebaseObject]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, model_class: Type[FirebaseObject], doc_id: str) -> Optional[FirebaseObject]:
+        """
+        Return a copy of the cached object, or None on a miss or an expired entry.
+        """
+        key = (model_class.collection_name(), doc_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            obj = entry[1]
+        return obj.model_copy(deep=True)  # Callers may mutate what they get back
+
+    def put(self, obj: FirebaseObject):
+        """
+        Store a copy of the object under its collection and ID.
+        """
+        collection = obj.collection_name()
+        ttl = self.ttls.get(collection, self.default_ttl)
+        if not obj.id or ttl <= 0:
+            return
+        entry = (time.monotonic() + ttl, obj.model_copy(deep=True))
+        with self._lock:
+            self._entries[(collection, obj.id)] = entry
+            self._entries.move_to_end((collection, obj.id))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, collection: str, doc_id: str):
+        """
+        Drop the entry of a single document, if cached.
+        """
+        with self._lock:
+            self._entries.pop((collection, doc_id), None)
+
+    def clear(self):
+        """
+        Drop all entries. Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit, miss and eviction counters together with the current size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
@@ -1,8 +1,40 @@
 # common/services/firebase/claims.py
 
-from typing import Dict, List, Any
-from firebase_admin import auth
-import requests
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Any, Optional
+from firebase_admin import auth, exceptions
+from pydantic import BaseModel
+from common.services.firebase.firebase_token_manager import FirebaseTokenManager
+
+# auth.get_users accepts at most 100 identifiers per call
+GET_USERS_LIMIT = 100
+DEFAULT_CLAIMS_WORKERS = 8
+DEFAULT_CLAIMS_RATE = 50.0  # Auth API calls per second
+
+# Outcome for one uid of ensure_baseline_roles_bulk
+class ClaimsUpdateResult(BaseModel):
+    uid: str
+    status: str  # "updated", "unchanged", "would_update" (dry run), "not_found" or "failed"
+    claims: Optional[Dict[str, Any]] = None  # Claims after the update (or that would be set in a dry run)
+    error: Optional[str] = None
+
+# Per-uid results and throughput of ensure_baseline_roles_bulk
+class ClaimsBulkReport(BaseModel):
+    results: List[ClaimsUpdateResult] = []
+    lookups: int = 0   # auth.get_users calls
+    writes: int = 0    # auth.set_custom_user_claims calls
+    retries: int = 0
+    elapsed: float = 0.0
+
+    def count(self, status: str) -> int:
+        return sum(1 for result in self.results if result.status == status)
+
+    @property
+    def users_per_sec(self) -> float:
+        return len(self.results) / self.elapsed if self.elapsed > 0 else 0.0
 
 def _merge_claims(current: Dict[str, Any] | None, patch: Dict[str, Any]) -> Dict[str, Any]:
     current = current or {}
@@ -31,28 +63,139 @@ def ensure_baseline_roles(uid: str, baseline: List[str] = ["user"]) -> Dict[str,
     if need_update:
         new_claims = _merge_claims(current, {"roles": sorted(roles)})
         auth.set_custom_user_claims(uid, new_claims)
+        _invalidate_tokens(uid)
         return new_claims
     return current
 
+def ensure_baseline_roles_bulk(
+    uids: Iterable[str],
+    baseline: List[str] = ["user"],
+    dry_run: bool = False,
+    workers: int = DEFAULT_CLAIMS_WORKERS,
+    max_per_second: float = DEFAULT_CLAIMS_RATE,
+    max_attempts: int = 5
+) -> ClaimsBulkReport:
+    """
+    Bulk variant of ensure_baseline_roles. Users are looked up 100 at a time with `auth.get_users`,
+    and `set_custom_user_claims` is only called for users missing a baseline role. All Auth API calls go
+    through `workers` threads and are paced to `max_per_second`; quota and availability errors are retried
+    with jittered backoff.
+
+    :param uids: User IDs; duplicates are ignored.
+    :param baseline: Roles every user must have.
+    :param dry_run: Compute and report the claims without writing them.
+    :param workers: Maximum number of concurrent Auth API calls.
+    :param max_per_second: Maximum Auth API calls started per second.
+    :param max_attempts: Attempts per call before the uid is reported as failed.
+    :return: Per-uid results in input order, with call counts and elapsed time.
+    """
+    started = time.perf_counter()
+    uids = list(dict.fromkeys(uids))
+    report = ClaimsBulkReport()
+    limiter = _RateLimiter(max_per_second)
+    stats_lock = threading.Lock()
+
+    def call(fn, *args):
+        for attempt in range(1, max_attempts + 1):
+            limiter.wait()
+            try:
+                return fn(*args)
+            except (exceptions.ResourceExhaustedError, exceptions.UnavailableError, exceptions.DeadlineExceededError):
+                if attempt == max_attempts:
+                    raise
+                with stats_lock:
+                    report.retries += 1
+                time.sleep(random.uniform(0, min(10.0, 0.5 * 2 ** attempt)))
+
+    def lookup(group: List[str]) -> Dict[str, Any]:
+        with stats_lock:
+            report.lookups += 1
+        try:
+            found = call(auth.get_users, [auth.UidIdentifier(uid) for uid in group])
+        except Exception as e:
+            return {uid: e for uid in group}
+        return {user.uid: user for user in found.users}
+
+    def ensure(uid: str, user: Any) -> ClaimsUpdateResult:
+        if isinstance(user, Exception):
+            return ClaimsUpdateResult(uid=uid, status="failed", error=f"Lookup failed: {user}")
+        if user is None:
+            return ClaimsUpdateResult(uid=uid, status="not_found")
+        current = user.custom_claims or {}
+        missing = [role for role in baseline if role not in set(current.get("roles", []))]
+        if not missing:
+            return ClaimsUpdateResult(uid=uid, status="unchanged", claims=current)
+        new_claims = _merge_claims(current, {"roles": missing})
+        if dry_run:
+            return ClaimsUpdateResult(uid=uid, status="would_update", claims=new_claims)
+        with stats_lock:
+            report.writes += 1
+        try:
+            call(auth.set_custom_user_claims, uid, new_claims)
+        except Exception as e:
+            return ClaimsUpdateResult(uid=uid, status="failed", claims=current, error=str(e))
+        _invalidate_tokens(uid)
+        return ClaimsUpdateResult(uid=uid, status="updated", claims=new_claims)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        groups = [uids[i:i + GET_USERS_LIMIT] for i in range(0, len(uids), GET_USERS_LIMIT)]
+        users: Dict[str, Any] = {}
+        for found in executor.map(lookup, groups):
+            users.update(found)
+        report.results = list(executor.map(lambda uid: ensure(uid, users.get(uid)), uids))
+
+    report.elapsed = time.perf_counter() - started
+    return report
+
+class _RateLimiter:
+    """
+    Spaces call starts at least 1 / rate seconds apart across threads.
+    """
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
 def set_claims(uid: str, claims: Dict[str, Any]) -> Dict[str, Any]:
     """
     Full set/overwrite of custom claims (use with caution).
     """
     auth.set_custom_user_claims(uid, claims)
+    _invalidate_tokens(uid)
     return claims
 
-def refresh_id_token(api_key: str, refresh_token: str) -> Dict[str, Any]:
+def refresh_id_token(api_key: str, refresh_token: str, force: bool = False) -> Dict[str, Any]:
     """
     Refreshes the ID token using the Secure Token API.
-    
-    """
-    url = f"https://securetoken.googleapis.com/v1/token?key={api_key}"
-    # IMPORTANT: Content-Type x-www-form-urlencoded
-    data = {
-        "grant_type": "refresh_token",
-        "refresh_token": refresh_token
-    }
-    r = requests.post(url, data=data, headers={"Content-Type": "application/x-www-form-urlencoded"})
-    if r.status_code != 200:
-        raise RuntimeError(f"SecureToken refresh failed: {r.status_code} {r.text}")
-    return r.json()
+    Goes through a shared FirebaseTokenManager: the connection is pooled, still valid tokens are
+    returned from its cache and concurrent refreshes of the same token make one request.
+    Claims changed through this module drop the user's cached tokens; pass `force` after changing them otherwise.
+
+    :param force: Skip the cache and always request a new token.
+    """
+    return _default_token_manager().refresh_id_token(api_key, refresh_token, force=force)
+
+_token_manager: Optional[FirebaseTokenManager] = None
+_token_manager_lock = threading.Lock()
+
+def _default_token_manager() -> FirebaseTokenManager:
+    global _token_manager
+    with _token_manager_lock:
+        if _token_manager is None:
+            _token_manager = FirebaseTokenManager()
+        return _token_manager
+
+def _invalidate_tokens(uid: str):
+    # Cached ID tokens carry the claims they were issued with
+    if _token_manager is not None:
+        _token_manager.invalidate_user(uid)
@@ -0,0 +1,44 @@
+import json
+import base64
+from datetime import datetime
+from typing import Any, List
+from pydantic import BaseModel
+from common.services.firebase.firebase_object import FirebaseObject
+from common.services.firebase.firebase_service_exception import FirebaseServiceException
+
+# One page of a cursor-paginated query
+class FirebasePage(BaseModel):
+    items: List[FirebaseObject]
+    # Opaque token that resumes iteration right after the last item of this page
+    cursor: str | None = None
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Encode the order-by values of the last document of a page (document ID last) into a URL-safe token.
+    """
+    def encode_value(value):
+        if isinstance(value, datetime):
+            return {"$ts": value.isoformat()}
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        raise FirebaseServiceException(f"Unsupported cursor value type: {type(value).__name__}")
+
+    raw = json.dumps([encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(token: str) -> List[Any]:
+    """
+    Decode a token produced by `encode_cursor` back into cursor values.
+    """
+    def decode_value(value):
+        if isinstance(value, dict) and "$ts" in value:
+            return datetime.fromisoformat(value["$ts"])
+        return value
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except Exception as e:
+        raise FirebaseServiceException(f"Invalid cursor token: {e}")
+    return [decode_value(v) for v in values]
@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+from common.services.firebase.firebase_object import FirebaseObject
+
+# Documents of a collection changed since a watermark, see FirebaseService.fetch_changed_since
+class FirebaseDelta(BaseModel):
+    collection: str
+    items: List[FirebaseObject]
+    # Pass to the next fetch_changed_since call; unchanged when nothing changed
+    watermark: Optional[datetime] = None
+    # True when the delta is a full snapshot of the collection (no previous watermark)
+    full: bool = False
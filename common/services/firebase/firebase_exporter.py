@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import gzip
+import os
+import time
+from typing import TYPE_CHECKING, Callable, List, Optional, Type
+from common.services.firebase.firebase_object import FirebaseObject
+from common.services.firebase.firebase_service_exception import FirebaseServiceException
+from common.services.firebase.firebase_transfer import (
+    FirebaseTransferProgress, read_checkpoint, write_checkpoint, clear_checkpoint,
+    require_pyarrow, parquet_columns, parquet_schema, to_parquet_row, part_files
+)
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+PARQUET_CHECKPOINT = "_checkpoint.json"
+DEFAULT_ROWS_PER_PART = 50_000
+
+# Streams a collection to gzip-compressed NDJSON or to Parquet part files, one page at a time.
+# Progress is checkpointed after every written page (NDJSON) or part (Parquet), and an interrupted
+# export continues from its checkpoint when run again with the same target.
+class FirebaseExporter:
+    def __init__(
+        self,
+        service,
+        page_size: int = 500,
+        progress: Optional[Callable[[FirebaseTransferProgress], None]] = None,
+        compresslevel: int = 6
+    ):
+        """
+        :param service: Service providing `iter_pages`, e.g. FirebaseService.
+        :param page_size: Documents fetched per round-trip; this bounds memory for NDJSON exports.
+        :param progress: Called with the progress after every checkpoint.
+        :param compresslevel: gzip compression level of NDJSON exports.
+        """
+        self.service = service
+        self.page_size = page_size
+        self.progress = progress
+        self.compresslevel = compresslevel
+
+    def export_ndjson(
+        self,
+        model_class: Type[FirebaseObject],
+        path: str,
+        filters: Optional[List[FieldFilter]] = None,
+        resume: bool = True
+    ) -> FirebaseTransferProgress:
+        """
+        Write every document as one JSON line (`model_dump_json`, unset fields excluded) to a gzip file.
+        Each page is compressed as its own gzip member, so the file is complete at every checkpoint;
+        on resume it is truncated back to the last checkpoint before appending.
+
+        :param model_class: The collection to export.
+        :param path: Target file, e.g. "publications.ndjson.gz". The checkpoint is kept next to it.
+        :param filters: Optional list of filters to apply to the query.
+        :param resume: Continue an interrupted export of the same file instead of starting over.
+        :return: Final progress.
+        """
+        checkpoint_path = path + CHECKPOINT_SUFFIX
+        state = read_checkpoint(checkpoint_path) if resume and os.path.exists(path) else None
+        try:
+            if state:
+                with open(path, "r+b") as f:
+                    f.truncate(state["offset"])  # Drop a page written after the last checkpoint
+            else:
+                open(path, "wb").close()
+
+            progress = self._start(model_class, state)
+            started = time.perf_counter()
+            with open(path, "ab") as f:
+                for page in self.service.iter_pages(model_class, filters=filters, page_size=self.page_size, cursor=progress.cursor):
+                    lines = "".join(obj.model_dump_json(exclude_unset=True) + "\n" for obj in page.items)
+                    f.write(gzip.compress(lines.encode(), compresslevel=self.compresslevel))
+                    f.flush()
+                    progress.documents += len(page.items)
+                    progress.cursor = page.cursor
+                    write_checkpoint(checkpoint_path, {"cursor": progress.cursor, "documents": progress.documents, "offset": f.tell()})
+                    self._report(progress, started)
+        except FirebaseServiceException:
+            raise
+        except Exception as e:
+            raise FirebaseServiceException(f"Error exporting {model_class.collection_name()} to {path}: {str(e)}")
+
+        clear_checkpoint(checkpoint_path)
+        progress.done = True
+        self._report(progress, started)
+        return progress
+
+    def export_parquet(
+        self,
+        model_class: Type[FirebaseObject],
+        directory: str,
+        filters: Optional[List[FieldFilter]] = None,
+        rows_per_part: int = DEFAULT_ROWS_PER_PART,
+        resume: bool = True
+    ) -> FirebaseTransferProgress:
+        """
+        Write the collection as Parquet part files (`part-00000.parquet`, ...) with one column per model field.
+        Nested models, lists and maps are stored as JSON strings. Requires pyarrow.
+
+        :param model_class: The collection to export.
+        :param directory: Target directory; it holds the part files and the checkpoint.
+        :param filters: Optional list of filters to apply to the query.
+        :param rows_per_part: Rows buffered before a part file is written; this bounds memory.
+        :param resume: Continue an interrupted export into the same directory instead of starting over.
+        :return: Final progress.
+        """
+        pa, pq = require_pyarrow()
+        columns = parquet_columns(model_class)
+        schema = parquet_schema(model_class)
+        checkpoint_path = os.path.join(directory, PARQUET_CHECKPOINT)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            state = read_checkpoint(checkpoint_path) if resume else None
+            parts = state["parts"] if state else 0
+            for part in part_files(directory)[parts:]:
+                os.remove(part)  # Written after the last checkpoint, or by a previous export
+
+            progress = self._start(model_class, state)
+            started = time.perf_counter()
+            rows = []
+
+            def write_part():
+                nonlocal parts, rows
+                part_path = os.path.join(directory, f"part-{parts:05d}.parquet")
+                pq.write_table(pa.Table.from_pylist(rows, schema=schema), f"{part_path}.tmp")
+                os.replace(f"{part_path}.tmp", part_path)
+                parts += 1
+                progress.documents += len(rows)
+                rows = []
+                write_checkpoint(checkpoint_path, {"cursor": progress.cursor, "documents": progress.documents, "parts": parts})
+                self._report(progress, started)
+
+            for page in self.service.iter_pages(model_class, filters=filters, page_size=self.page_size, cursor=progress.cursor):
+                rows.extend(to_parquet_row(obj, columns) for obj in page.items)
+                progress.cursor = page.cursor
+                if len(rows) >= rows_per_part:
+                    write_part()
+            if rows:
+                write_part()
+        except FirebaseServiceException:
+            raise
+        except Exception as e:
+            raise FirebaseServiceException(f"Error exporting {model_class.collection_name()} to {directory}: {str(e)}")
+
+        clear_checkpoint(checkpoint_path)
+        progress.done = True
+        self._report(progress, started)
+        return progress
+
+    @staticmethod
+    def _start(model_class: Type[FirebaseObject], state: Optional[dict]) -> FirebaseTransferProgress:
+        documents = state["documents"] if state else 0
+        return FirebaseTransferProgress(
+            collection=model_class.collection_name(),
+            documents=documents,
+            resumed_from=documents,
+            cursor=state["cursor"] if state else None
+        )
+
+    def _report(self, progress: FirebaseTransferProgress, started: float):
+        progress.elapsed = time.perf_counter() - started
+        if self.progress is not None:
+            self.progress(progress)
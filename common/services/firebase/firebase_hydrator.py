@@ -0,0 +1,161 @@
+import logging
+import typing
+from enum import Enum
+from functools import lru_cache
+from itertools import count
+from typing import Any, Callable, Dict, Optional, Type
+from pydantic import BaseModel, ValidationError
+from common.services.firebase.firebase_service_exception import FirebaseServiceException
+
+logger = logging.getLogger(__name__)
+
+_REQUIRED = object()
+
+
+def construct_model(model_class: Type[BaseModel], data: Dict[str, Any]) -> BaseModel:
+    """
+    Build a model from trusted data without validation, recursing into nested models
+    (including lists and dicts of models) and coercing enum values like validation would.
+    Equivalent to `model_construct`, but with the per-field work planned once per class.
+    """
+    plan = _construction_plan(model_class)
+    if plan is None:
+        return model_class.model_construct(**data)
+
+    fields, field_names, private, allow_extra = plan
+    values = {}
+    for name, convert, default, default_factory in fields:
+        if name in data:
+            value = data[name]
+            values[name] = convert(value) if convert is not None and value is not None else value
+        elif default_factory is not None:
+            values[name] = default_factory()
+        elif default is not _REQUIRED:
+            values[name] = default
+
+    obj = model_class.__new__(model_class)
+    object.__setattr__(obj, "__dict__", values)
+    object.__setattr__(obj, "__pydantic_fields_set__", field_names & data.keys())
+    object.__setattr__(obj, "__pydantic_extra__", {k: v for k, v in data.items() if k not in field_names} if allow_extra else None)
+    object.__setattr__(obj, "__pydantic_private__", {name: attr.get_default() for name, attr in private.items()} if private else None)
+    return obj
+
+
+@lru_cache(maxsize=None)
+def _construction_plan(model_class: Type[BaseModel]) -> Optional[tuple]:
+    """
+    Per-field conversion and default of a model class, computed once. A None converter means "use the value as is".
+    Returns None for models that need the generic `model_construct` (aliases).
+    """
+    if any(field.alias or field.validation_alias for field in model_class.model_fields.values()):
+        return None
+    keep_enum_values = bool(model_class.model_config.get("use_enum_values"))
+
+    fields = []
+    for name, field in model_class.model_fields.items():
+        default, default_factory = _REQUIRED, None
+        if field.default_factory is not None:
+            default_factory = field.default_factory
+        elif not field.is_required():
+            default = field.default
+            if isinstance(default, (list, dict, set, BaseModel)):
+                default_factory = lambda field=field: field.get_default(call_default_factory=True)
+        fields.append((name, _converter(field.annotation, keep_enum_values), default, default_factory))
+
+    private = dict(model_class.__private_attributes__)
+    return fields, frozenset(model_class.model_fields), private, model_class.model_config.get("extra") == "allow"
+
+
+def _converter(annotation: Any, keep_enum_values: bool) -> Optional[Callable[[Any], Any]]:
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return lambda value: construct_model(annotation, value) if isinstance(value, dict) else value
+
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        if keep_enum_values:
+            return None
+
+        def to_enum(value):
+            try:
+                return annotation(value)
+            except ValueError:
+                return value
+        return to_enum
+
+    if origin in (list, tuple, set, frozenset) and args:
+        item = _converter(args[0], keep_enum_values)
+        if item is None:
+            return None
+        return lambda value: [item(v) if v is not None else v for v in value] if isinstance(value, (list, tuple)) else value
+
+    if origin is dict and len(args) == 2:
+        item = _converter(args[1], keep_enum_values)
+        if item is None:
+            return None
+        return lambda value: {k: item(v) if v is not None else v for k, v in value.items()} if isinstance(value, dict) else value
+
+    if args:  # Optional[X] and other unions: use the first member that needs conversion
+        for arg in args:
+            if arg is not type(None):
+                convert = _converter(arg, keep_enum_values)
+                if convert is not None:
+                    return convert
+    return None
+
+
+# Converts Firestore data into models. By default every document is copied and validated;
+# in trusted mode snapshot data is used without copying (see `read`), documents are constructed
+# without validation and only 1 in `validate_every` is fully validated to catch schema drift.
+class FirebaseHydrator:
+    def __init__(self, trusted: bool = False, validate_every: int = 0, raise_on_drift: bool = False):
+        """
+        :param trusted: Use snapshot data without copying and build models with `construct_model` instead of validating them.
+            Only for documents written by this code base.
+        :param validate_every: In trusted mode, fully validate every N-th document (0 disables sampling).
+        :param raise_on_drift: Raise FirebaseServiceException when a sampled document fails validation,
+            instead of logging a warning.
+        """
+        self.trusted = trusted
+        self.validate_every = validate_every
+        self.raise_on_drift = raise_on_drift
+        self.hydrated = 0
+        self.validated = 0
+        self.drift = 0
+        self._counter = count(1)
+
+    def read(self, doc: Any) -> Dict[str, Any]:
+        """
+        Extract the data of a document snapshot. `to_dict()` deep-copies the snapshot data, which costs
+        more than validation itself; trusted mode reads the snapshot's `_data` without that copy.
+        That attribute is private to the SDK: snapshots without it fall back to `to_dict()`.
+
+        Only the top level is copied, so nested maps and lists of the result (and of the models built from it)
+        are the snapshot's own objects. Snapshots are not kept by the services, so that is safe there;
+        callers reading their own snapshots in trusted mode must not use them after changing the models.
+        """
+        if self.trusted and isinstance(getattr(doc, "_data", None), dict):
+            return dict(doc._data)  # The caller adds "id"
+        return doc.to_dict() or {}
+
+    def hydrate(self, model_class: Type[BaseModel], data: Dict[str, Any]) -> BaseModel:
+        self.hydrated += 1
+        if not self.trusted:
+            return model_class(**data)
+
+        if self.validate_every and next(self._counter) % self.validate_every == 0:
+            self.validated += 1
+            try:
+                return model_class(**data)
+            except ValidationError as e:
+                self.drift += 1
+                message = f"Schema drift in {model_class.__name__} document {data.get('id')}: {e}"
+                if self.raise_on_drift:
+                    raise FirebaseServiceException(message)
+                logger.warning(message)
+
+        return construct_model(model_class, data)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hydrated": self.hydrated, "validated": self.validated, "drift": self.drift}
@@ -0,0 +1,112 @@
+import gzip
+import json
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, Optional, Type
+from common.services.firebase.firebase_object import FirebaseObject
+from common.services.firebase.firebase_service_exception import FirebaseServiceException
+from common.services.firebase.firebase_service_interface import FirebaseServiceInterface
+from common.services.firebase.firebase_transfer import (
+    FirebaseTransferProgress, read_checkpoint, write_checkpoint, clear_checkpoint,
+    require_pyarrow, parquet_columns, from_parquet_row, part_files
+)
+
+CHECKPOINT_SUFFIX = ".import-checkpoint.json"
+DEFAULT_CHUNK_SIZE = 2_000
+
+# Loads files written by FirebaseExporter back into their collection through chunked `batch_update` calls.
+# Documents keep their IDs and are merged into existing ones. The number of imported documents is
+# checkpointed after every chunk, and an interrupted import skips them when run again.
+class FirebaseImporter:
+    def __init__(
+        self,
+        service: FirebaseServiceInterface,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        concurrency: int = 4,
+        progress: Optional[Callable[[FirebaseTransferProgress], None]] = None
+    ):
+        """
+        :param service: Service to write through.
+        :param chunk_size: Documents validated and written per `batch_update` call; this bounds memory.
+        :param concurrency: Batches of a chunk committed at the same time.
+        :param progress: Called with the progress after every chunk.
+        """
+        self.service = service
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.progress = progress
+
+    def import_ndjson(self, model_class: Type[FirebaseObject], path: str, resume: bool = True) -> FirebaseTransferProgress:
+        """
+        Import a gzip NDJSON export.
+
+        :param model_class: The collection to import into.
+        :param path: File written by `FirebaseExporter.export_ndjson`.
+        :param resume: Skip the documents imported by an interrupted run of the same file.
+        :return: Final progress.
+        """
+        def records() -> Iterator[Dict[str, Any]]:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+        return self._load(model_class, records(), path + CHECKPOINT_SUFFIX, resume)
+
+    def import_parquet(self, model_class: Type[FirebaseObject], directory: str, resume: bool = True) -> FirebaseTransferProgress:
+        """
+        Import a Parquet export, part file by part file. Requires pyarrow.
+
+        :param model_class: The collection to import into.
+        :param directory: Directory written by `FirebaseExporter.export_parquet`.
+        :param resume: Skip the documents imported by an interrupted run of the same directory.
+        :return: Final progress.
+        """
+        _, pq = require_pyarrow()
+        columns = parquet_columns(model_class)
+
+        def records() -> Iterator[Dict[str, Any]]:
+            for part in part_files(directory):
+                for batch in pq.ParquetFile(part).iter_batches(batch_size=self.chunk_size):
+                    for row in batch.to_pylist():
+                        yield from_parquet_row(row, columns)
+
+        return self._load(model_class, records(), f"{directory.rstrip('/')}{CHECKPOINT_SUFFIX}", resume)
+
+    def _load(
+        self,
+        model_class: Type[FirebaseObject],
+        records: Iterator[Dict[str, Any]],
+        checkpoint_path: str,
+        resume: bool
+    ) -> FirebaseTransferProgress:
+        state = read_checkpoint(checkpoint_path) if resume else None
+        documents = state["documents"] if state else 0
+        progress = FirebaseTransferProgress(collection=model_class.collection_name(), documents=documents, resumed_from=documents)
+        started = time.perf_counter()
+        try:
+            records = islice(records, documents, None)
+            while True:
+                chunk = [model_class(**data) for data in islice(records, self.chunk_size)]
+                if not chunk:
+                    break
+                if any(not obj.id for obj in chunk):
+                    raise FirebaseServiceException(f"Import into {model_class.collection_name()} failed: a record has no ID.")
+                self.service.batch_update(chunk, concurrency=self.concurrency)
+                progress.documents += len(chunk)
+                write_checkpoint(checkpoint_path, {"documents": progress.documents})
+                self._report(progress, started)
+        except FirebaseServiceException:
+            raise
+        except Exception as e:
+            raise FirebaseServiceException(f"Error importing into {model_class.collection_name()}: {str(e)}")
+
+        clear_checkpoint(checkpoint_path)
+        progress.done = True
+        self._report(progress, started)
+        return progress
+
+    def _report(self, progress: FirebaseTransferProgress, started: float):
+        progress.elapsed = time.perf_counter() - started
+        if self.progress is not None:
+            self.progress(progress)
@@ -0,0 +1,52 @@
+from typing import Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel
+from common.models.project import Asset, Publication, Reading
+from common.services.firebase.firebase_object import FirebaseObject
+from common.services.firebase.firebase_service import FirebaseService
+
+# Publication together with its resolved relationships
+class LoadedPublication(BaseModel):
+    publication: Publication
+    assets: List[Asset]
+    readings: List[Reading]
+
+
+# Batched relationship loader with a per-request identity map.
+# Create one instance per request: each document is fetched at most once during its lifetime.
+class FirebaseLoader:
+    def __init__(self, service: FirebaseService):
+        self.service = service
+        self._identity_map: Dict[Tuple[str, str], Optional[FirebaseObject]] = {}
+
+    def get_many(self, model_class: Type[FirebaseObject], ids: List[str]) -> List[Optional[FirebaseObject]]:
+        """
+        Resolve document IDs, fetching only the ones not loaded yet, in one batched read.
+
+        :param model_class: The class to which the documents should be mapped.
+        :param ids: Document IDs to resolve.
+        :return: One entry per ID, in input order, with None for documents that do not exist.
+        """
+        collection = model_class.collection_name()
+        missing = [doc_id for doc_id in dict.fromkeys(ids) if (collection, doc_id) not in self._identity_map]
+        if missing:
+            for doc_id, obj in zip(missing, self.service.fetch_many(model_class, missing)):
+                self._identity_map[(collection, doc_id)] = obj
+        return [self._identity_map[(collection, doc_id)] for doc_id in ids]
+
+    def load_publications(self, publications: List[Publication]) -> List[LoadedPublication]:
+        """
+        Resolve `assets` and `readings` of many publications with one batched read per collection.
+        Missing documents are skipped.
+
+        :param publications: Publications whose relationships should be loaded.
+        :return: One LoadedPublication per publication, in input order.
+        """
+        self.get_many(Asset, [asset_id for p in publications for asset_id in p.assets])
+        self.get_many(Reading, [reading_id for p in publications for reading_id in p.readings])
+
+        loaded = []
+        for publication in publications:
+            assets = [a for a in self.get_many(Asset, publication.assets) if a is not None]
+            readings = [r for r in self.get_many(Reading, publication.readings) if r is not None]
+            loaded.append(LoadedPublication(publication=publication, assets=assets, readings=readings))
+        return loaded
@@ -0,0 +1,212 @@
+from enum import Enum
+from threading import Event, RLock, Thread
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
+from common.services.firebase.firebase_hydrator import FirebaseHydrator
+from common.services.firebase.firebase_object import FirebaseObject
+from common.services.firebase.firebase_service_exception import FirebaseServiceException
+
+ADDED = "ADDED"
+MODIFIED = "MODIFIED"
+REMOVED = "REMOVED"
+
+DEFAULT_MAX_DOCUMENTS = 10_000
+
+# In-process mirror of a query, kept up to date by Firestore snapshot listeners.
+# Reads are served from memory. Documents that fail to hydrate are left out and recorded in `errors`. The query can be anything exposing `on_snapshot(callback)`
+# that returns a watch with `unsubscribe()`, so a local stand-in can drive it in tests.
+class FirebaseMirror:
+    def __init__(
+        self,
+        model_class: Type[FirebaseObject],
+        query: Any,
+        index_by: Optional[List[str]] = None,
+        max_documents: int = DEFAULT_MAX_DOCUMENTS,
+        on_change: Optional[Callable[["FirebaseMirror", List[Tuple[str, FirebaseObject]]], None]] = None,
+        hydrator: Optional[FirebaseHydrator] = None
+    ):
+        """
+        :param model_class: The class to which the documents should be mapped.
+        :param query: Query to listen to.
+        :param index_by: Fields to build equality indexes for, used by `find`.
+        :param max_documents: Upper bound on mirrored documents. When exceeded, the mirror stops listening,
+            drops its contents and raises on reads, so callers can fall back to regular queries.
+        :param on_change: Called after every applied snapshot with (change type, object) pairs.
+        :param hydrator: Converts document data into models, normally the one of the owning service.
+        """
+        self.model_class = model_class
+        self.query = query
+        self.index_by = list(index_by or [])
+        self.max_documents = max_documents
+        self.on_change = on_change
+        self.hydrator = hydrator or FirebaseHydrator()
+        self.overflowed = False
+        self._documents: Dict[str, FirebaseObject] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._indexes: Dict[str, Dict[Any, Set[str]]] = {field: {} for field in self.index_by}
+        self._lock = RLock()
+        self._ready = Event()
+        self._watch = None
+
+    def start(self) -> "FirebaseMirror":
+        """
+        Attach the snapshot listener. The first snapshot delivers the full initial result set.
+        """
+        self._watch = self.query.on_snapshot(self._on_snapshot)
+        return self
+
+    def close(self):
+        """
+        Detach the snapshot listener. Mirrored documents stay readable.
+        """
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the initial snapshot was applied.
+
+        :return: False if the timeout expired first.
+        """
+        return self._ready.wait(timeout)
+
+    def get(self, doc_id: str) -> Optional[FirebaseObject]:
+        with self._lock:
+            self._check_usable()
+            return self._documents.get(doc_id)
+
+    def all(self) -> List[FirebaseObject]:
+        with self._lock:
+            self._check_usable()
+            return list(self._documents.values())
+
+    def find(self, field: str, value: Any) -> List[FirebaseObject]:
+        """
+        Return mirrored documents whose `field` equals `value`, using the index if one was requested.
+        """
+        with self._lock:
+            self._check_usable()
+            index = self._indexes.get(field)
+            if index is not None:
+                return [self._documents[doc_id] for doc_id in index.get(self._index_key(value), ())]
+            return [obj for obj in self._documents.values() if getattr(obj, field, None) == value]
+
+    @property
+    def errors(self) -> Dict[str, Exception]:
+        """
+        Documents that could not be hydrated, by ID, with the error raised. A document leaves this map
+        once a later change to it hydrates successfully or it is removed.
+        """
+        with self._lock:
+            return dict(self._errors)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._documents)
+
+    def apply_change(self, change_type: str, doc_id: str, data: Optional[Dict[str, Any]] = None) -> Optional[FirebaseObject]:
+        """
+        Apply a single change to the mirror.
+
+        :param change_type: ADDED, MODIFIED or REMOVED.
+        :param doc_id: ID of the changed document.
+        :param data: Document data for ADDED and MODIFIED changes.
+        :return: The object that was added, modified or removed; None if the document failed to hydrate.
+        """
+        obj = self._hydrate(change_type, doc_id, data)
+        with self._lock:
+            return self._apply(change_type, doc_id, obj)
+
+    def _hydrate(self, change_type: str, doc_id: str, data: Optional[Dict[str, Any]]) -> Any:
+        """
+        Build the model for a change, or return the error raised while doing so.
+        """
+        if change_type == REMOVED:
+            return None
+        try:
+            return self.hydrator.hydrate(self.model_class, {**(data or {}), "id": doc_id})
+        except Exception as e:
+            return e
+
+    def _apply(self, change_type: str, doc_id: str, obj: Any) -> Optional[FirebaseObject]:
+        previous = self._documents.pop(doc_id, None)
+        if previous is not None:
+            self._unindex(previous)
+        self._errors.pop(doc_id, None)
+
+        if change_type == REMOVED:
+            return previous
+        if isinstance(obj, Exception):
+            # A stale copy of the document would be worse than none
+            self._errors[doc_id] = obj
+            return None
+
+        self._documents[doc_id] = obj
+        for field, index in self._indexes.items():
+            value = self._index_key(getattr(obj, field, None))
+            if self._indexable(value):
+                index.setdefault(value, set()).add(doc_id)
+        return obj
+
+    def _on_snapshot(self, docs, changes, read_time):
+        """
+        Snapshot listener callback. Runs on the listener thread.
+        Documents are hydrated before taking the lock, so reads are not held up by validation.
+        """
+        if self.overflowed:
+            return
+        hydrated = []
+        for change in changes:
+            doc = change.document
+            change_type = change.type.name
+            data = self.hydrator.read(doc) if change_type != REMOVED else None
+            hydrated.append((change_type, doc.id, self._hydrate(change_type, doc.id, data)))
+
+        applied = []
+        with self._lock:
+            if self.overflowed:
+                return
+            for change_type, doc_id, obj in hydrated:
+                obj = self._apply(change_type, doc_id, obj)
+                if obj is not None:
+                    applied.append((change_type, obj))
+
+            if len(self._documents) > self.max_documents:
+                self.overflowed = True
+                self._documents.clear()
+                self._errors.clear()
+                self._indexes = {field: {} for field in self.index_by}
+                applied = []
+
+        if self.overflowed:
+            # The listener cannot be stopped from its own thread
+            Thread(target=self.close, daemon=True).start()
+        self._ready.set()
+
+        if applied and self.on_change is not None:
+            self.on_change(self, applied)
+
+    def _unindex(self, obj: FirebaseObject):
+        for field, index in self._indexes.items():
+            value = self._index_key(getattr(obj, field, None))
+            ids = index.get(value) if self._indexable(value) else None
+            if ids is not None:
+                ids.discard(obj.id)
+                if not ids:
+                    del index[value]
+
+    @staticmethod
+    def _index_key(value: Any) -> Any:
+        # Enum members and their raw values must land in the same bucket
+        return value.value if isinstance(value, Enum) else value
+
+    @staticmethod
+    def _indexable(value: Any) -> bool:
+        # Only scalar values are indexed; lists and maps fall back to a scan in `find`
+        return value is None or isinstance(value, (str, int, float, bool))
+
+    def _check_usable(self):
+        if self.overflowed:
+            raise FirebaseServiceException(
+                f"Mirror of {self.model_class.collection_name()} exceeded {self.max_documents} documents and was stopped."
+            )
@@ -1,12 +1,58 @@
 from abc import ABC, abstractmethod
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, PrivateAttr
+from typing import Any, ClassVar, Dict, Optional, Tuple
+
+# Marker for nested keys removed since the last snapshot, see FirebaseObject.dirty_fields
+DELETED = object()
 
 # Abstract base class for Firebase object
 class FirebaseObject(ABC, BaseModel):
+    # Field holding the lifecycle state, used by FirebaseService.transition
+    STATE_FIELD: ClassVar[Optional[str]] = None
+    # Field stamped with the server time on every write, used by FirebaseService.fetch_changed_since
+    UPDATED_AT_FIELD: ClassVar[Optional[str]] = None
+
     id: Optional[str] = None
-    
+
+    # State as last loaded from / written to Firestore, None when not tracked
+    _snapshot: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+
     @staticmethod
     @abstractmethod
     def collection_name():
-        pass
\ No newline at end of file
+        pass
+
+    def mark_clean(self):
+        """
+        Snapshot the current state; `dirty_fields` reports changes relative to it.
+        """
+        self._snapshot = self.model_dump(exclude_unset=True, exclude={"id"})
+
+    @property
+    def is_tracked(self) -> bool:
+        return self._snapshot is not None
+
+    def dirty_fields(self) -> Dict[Tuple[str, ...], Any]:
+        """
+        Fields changed since `mark_clean`, as field path parts mapped to their new value.
+        Nested maps are compared key by key, so only changed keys are reported; keys removed
+        from a map are reported with the DELETED marker. Lists are compared as a whole.
+        Every set field is reported when the object is not tracked.
+        """
+        current = self.model_dump(exclude_unset=True, exclude={"id"})
+        changes: Dict[Tuple[str, ...], Any] = {}
+
+        def diff(path: Tuple[str, ...], new: Dict[str, Any], old: Dict[str, Any]):
+            for key, value in new.items():
+                if key not in old:
+                    changes[(*path, key)] = value
+                elif isinstance(value, dict) and isinstance(old[key], dict) and value and old[key]:
+                    diff((*path, key), value, old[key])
+                elif value != old[key]:
+                    changes[(*path, key)] = value
+            if path:  # Top-level fields cannot become unset, nested keys can disappear
+                for key in old.keys() - new.keys():
+                    changes[(*path, key)] = DELETED
+
+        diff((), current, self._snapshot or {})
+        return changes
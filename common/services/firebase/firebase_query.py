@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import copy
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple, Type
+from common.services.firebase.firebase_object import FirebaseObject
+
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.base_query import BaseQuery, FieldFilter
+
+ASCENDING = "ASCENDING"
+DESCENDING = "DESCENDING"
+
+# Composable, immutable description of a Firestore query over a model's collection.
+# Every builder method returns a new FirebaseQuery; run it with FirebaseService.fetch.
+class FirebaseQuery:
+    def __init__(self, model_class: Type[FirebaseObject], filters: Optional[List[FieldFilter]] = None):
+        self.model_class = model_class
+        self.filters: List[FieldFilter] = list(filters or [])
+        self.orders: List[Tuple[str, str]] = []
+        self.fields: Optional[List[str]] = None
+        self.limit_count: Optional[int] = None
+        self.limit_to_last_count: Optional[int] = None
+        self.cursors: List[Tuple[str, Any]] = []  # (query method name, cursor values)
+
+    def where(self, filter: FieldFilter) -> "FirebaseQuery":
+        return self._with(lambda q: q.filters.append(filter))
+
+    def order_by(self, field: str, descending: bool = False) -> "FirebaseQuery":
+        return self._with(lambda q: q.orders.append((field, DESCENDING if descending else ASCENDING)))
+
+    def select(self, fields: List[str]) -> "FirebaseQuery":
+        """
+        Fetch only the given fields; see `FirebaseService.fetch_all`.
+        """
+        return self._with(lambda q: setattr(q, "fields", list(fields)))
+
+    def limit(self, count: int) -> "FirebaseQuery":
+        return self._with(lambda q: setattr(q, "limit_count", count))
+
+    def limit_to_last(self, count: int) -> "FirebaseQuery":
+        """
+        Return the last `count` documents of the ordering. Requires at least one `order_by`.
+        """
+        return self._with(lambda q: setattr(q, "limit_to_last_count", count))
+
+    def start_at(self, *values: Any) -> "FirebaseQuery":
+        return self._with_cursor("start_at", values)
+
+    def start_after(self, *values: Any) -> "FirebaseQuery":
+        return self._with_cursor("start_after", values)
+
+    def end_at(self, *values: Any) -> "FirebaseQuery":
+        return self._with_cursor("end_at", values)
+
+    def end_before(self, *values: Any) -> "FirebaseQuery":
+        return self._with_cursor("end_before", values)
+
+    def build(self, collection_ref: Any) -> BaseQuery:
+        """
+        Apply this description to a Firestore collection reference.
+
+        :param collection_ref: Collection reference of `model_class`.
+        :return: The Firestore query.
+        """
+        from google.cloud.firestore_v1 import DocumentSnapshot
+        from common.services.firebase.firebase_service import FirebaseService
+
+        query = collection_ref
+        for filter in self.filters:
+            query = query.where(filter=filter)
+        if self.fields is not None:
+            query = query.select(FirebaseService._projection(self.fields))
+        for field, direction in self.orders:
+            query = query.order_by(field, direction=direction)
+        for method, values in self.cursors:
+            # A single dict or snapshot is passed as is, positional values as a list matching `order_by`
+            cursor = values[0] if len(values) == 1 and isinstance(values[0], (dict, DocumentSnapshot)) else list(values)
+            query = getattr(query, method)(cursor)
+        if self.limit_count is not None:
+            query = query.limit(self.limit_count)
+        if self.limit_to_last_count is not None:
+            query = query.limit_to_last(self.limit_to_last_count)
+        return query
+
+    def _with_cursor(self, method: str, values: Tuple[Any, ...]) -> "FirebaseQuery":
+        return self._with(lambda q: q.cursors.append((method, values)))
+
+    def _with(self, change) -> "FirebaseQuery":
+        clone = copy.copy(self)
+        clone.filters = list(self.filters)
+        clone.orders = list(self.orders)
+        clone.cursors = list(self.cursors)
+        change(clone)
+        return clone
@@ -1,23 +1,87 @@
+from __future__ import annotations
+
 import json
-import firebase_admin
-from typing import List, Type, Optional
-from firebase_admin import credentials, firestore
-from google.cloud.firestore_v1.base_query import FieldFilter
+import logging
+import time
+import random
+from enum import Enum
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from queue import Full, Queue
+from threading import Event, Lock
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Set, Tuple, Type, Optional
+from common.services.firebase.firebase_bulk_result import FirebaseBulkWriteResult
+from common.services.firebase.firebase_delta import FirebaseDelta
+from common.services.firebase.firebase_cache import FirebaseModelCache
+from common.services.firebase.firebase_hydrator import FirebaseHydrator, construct_model
+from common.services.firebase.firebase_query import FirebaseQuery
+from common.services.firebase.firebase_mirror import FirebaseMirror, DEFAULT_MAX_DOCUMENTS
+from common.services.firebase.firebase_cursor import FirebasePage, encode_cursor, decode_cursor
 from common.services.firebase.firebase_service_exception import FirebaseServiceException
 from common.services.firebase.firebase_service_interface import FirebaseServiceInterface
-from common.services.firebase.firebase_object import FirebaseObject
+from common.services.firebase.firebase_object import FirebaseObject, DELETED
+from common.services.firebase.firebase_timestamps import stamped
+from common.services.firebase.firebase_write_buffer import FirebaseWriteBuffer, flatten
+
+logger = logging.getLogger(__name__)
+
+# The Firebase SDK takes several hundred milliseconds to import: it is loaded on first use
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1 import Client, DocumentReference, DocumentSnapshot, WriteBatch
+    from google.cloud.firestore_v1.base_query import FieldFilter
+    from google.cloud.firestore_v1.bulk_writer import BulkWriter, BulkWriterOptions
+
+# Firestore rejects batches with more than 500 writes
+BATCH_WRITE_LIMIT = 500
+DEFAULT_BATCH_CONCURRENCY = 4
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_SCAN_WORKERS = 8
+# Seconds subtracted from the local clock when it provides the watermark of a full sync
+DEFAULT_CLOCK_SKEW = 30.0
 
 # Firebase service implementation
 class FirebaseService(FirebaseServiceInterface):
-    def __init__(self, api_key: str, database_id: str):
-        self.db = None
-        self.__initialize(api_key=api_key, database_id=database_id)
+    def __init__(
+        self,
+        api_key: str,
+        database_id: str,
+        cache: Optional[FirebaseModelCache] = None,
+        hydrator: Optional[FirebaseHydrator] = None,
+        track_changes: bool = False,
+        write_buffer: Optional[FirebaseWriteBuffer] = None,
+        client: Optional[Client] = None
+    ):
+        self._db: Optional[Client] = client  # Injected client (e.g. InMemoryFirestoreClient); created from api_key otherwise
+        self._api_key = api_key
+        self._database_id = database_id
+        self._db_lock = Lock()
+        self.cache = cache  # Optional read-through cache for fetch_by_id
+        self.hydrator = hydrator or FirebaseHydrator()  # Validates every document unless configured as trusted
+        self.track_changes = track_changes  # Snapshot loaded objects so updates only send changed fields
+        self.write_buffer = write_buffer  # Optional write-behind buffer coalescing `update` calls
+        self.transition_stats: Dict[str, int] = {"attempts": 0, "contentions": 0, "transitions": 0, "rejected": 0, "exhausted": 0}
+        self._stats_lock = Lock()
+        if self.write_buffer is not None:
+            self.write_buffer.start(self._commit_buffered)
+
+    @property
+    def db(self) -> Client:
+        """
+        Firestore client, created on first use.
+        """
+        if self._db is None:
+            with self._db_lock:
+                if self._db is None:
+                    self._db = self.__initialize(api_key=self._api_key, database_id=self._database_id)
+        return self._db
 
-    def __initialize(self, api_key: str, database_id: str):
+    def __initialize(self, api_key: str, database_id: str) -> Client:
         """
         Initialize Firebase Admin SDK with the service account key from the environment.
         """
-        
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
         if not firebase_admin._apps:  # Check if Firebase app is already initialized
             # If you're using the raw JSON string, load it as a dictionary
             cred_dict = json.loads(api_key)
@@ -25,7 +89,7 @@ class FirebaseService(FirebaseServiceInterface):
             firebase_admin.initialize_app(cred)
 
         # Initialize Firestore client
-        self.db = firestore.client(database_id=database_id)
+        return firestore.client(database_id=database_id)
 
     def add(self, obj: FirebaseObject) -> FirebaseObject:
         """
@@ -40,8 +104,10 @@ class FirebaseService(FirebaseServiceInterface):
             # Access the specified collection
             collection_ref = self.db.collection(obj.collection_name())
             # Add the object to Firestore
-            _, doc_ref = collection_ref.add(obj.model_dump(exclude_unset=True))
+            _, doc_ref = collection_ref.add(stamped(obj, obj.model_dump(exclude_unset=True)))
             obj.id = doc_ref.id
+            if self.track_changes:
+                obj.mark_clean()
             return obj  # Return the document with ID
         except Exception as e:
             # Raise a custom exception if there's an error
@@ -57,10 +123,14 @@ class FirebaseService(FirebaseServiceInterface):
         """
 
         try:
+            self._discard_buffered(obj.collection_name(), doc_id)  # The document is replaced as a whole
             # Access the specified collection
             collection_ref = self.db.collection(obj.collection_name()).document(doc_id)
             # Add the object with specific ID to Firestore
-            collection_ref.set(obj.model_dump(exclude_unset=True))
+            collection_ref.set(stamped(obj, obj.model_dump(exclude_unset=True)))
+            self._invalidate(obj.collection_name(), doc_id)
+            if self.track_changes:
+                obj.mark_clean()
             return obj  # Return the document
         except Exception as e:
             # Raise a custom exception if there's an error
@@ -74,6 +144,7 @@ class FirebaseService(FirebaseServiceInterface):
         :param document_id: The document ID of the object to delete.
         """
         try:
+            self._discard_buffered(model_class.collection_name(), doc_id)  # Pending updates must not recreate it
             # Access the specified collection
             collection_ref = self.db.collection(model_class.collection_name())
 
@@ -82,94 +153,519 @@ class FirebaseService(FirebaseServiceInterface):
 
             # Delete the document
             doc_ref.delete()
+            self._invalidate(model_class.collection_name(), doc_id)
         except Exception as e:
             raise FirebaseServiceException(f"Failed to delete document: {str(e)}")
         
-    def fetch_all(self, model_class: Type[FirebaseObject], filters: Optional[List[FieldFilter]] = None) -> List[FirebaseObject]:
+    def fetch_all(
+        self,
+        model_class: Type[FirebaseObject],
+        filters: Optional[List[FieldFilter]] = None,
+        fields: Optional[List[str]] = None
+    ) -> List[FirebaseObject]:
         """
         Fetch all documents from a specified Firestore collection and convert them into objects of type `model_class`.
 
-        :param collection_name: Name of the Firestore collection to fetch data from.
         :param model_class: The class to which the documents should be mapped (e.g., User, Product).
+        :param filters: Optional list of filters to apply to the query.
+        :param fields: Optional field paths to fetch (Firestore `select`). The result objects are then partial:
+            built with `model_construct`, without validation, and only the fetched fields are set.
         :return: A list of objects of type `model_class`.
         """
         try:
             # Get all documents from the specified Firestore collection
-            collection_ref = self.db.collection(model_class.collection_name())
+            query = self.db.collection(model_class.collection_name())
 
             # Apply the filter if provided
-            if filters:
-                filtered = collection_ref
-                for filter in filters:
-                    filtered = filtered.where(filter=filter)
-                documents = filtered.stream()
-            else:
-                documents = collection_ref.stream()
+            for filter in filters or []:
+                query = query.where(filter=filter)
 
-            objects = []
-            for doc in documents:
-                # Convert Firestore document to model instance
-                data = doc.to_dict()
-                data["id"] = doc.id  # Include the document ID
-                obj = model_class(**data)  # Create an instance of the model class using the data
-                objects.append(obj)
+            # Fetch only the requested fields if provided
+            if fields is not None:
+                query = query.select(self._projection(fields))
 
-            return objects
+            # Convert Firestore documents to model instances
+            return [self._to_model(model_class, doc, fields) for doc in query.stream()]
 
         except Exception as e:
             raise FirebaseServiceException(f"Error fetching documents from {model_class.collection_name()}: {str(e)}")
 
-    def fetch_by_id(self, model_class: Type[FirebaseObject], doc_id: str) -> Optional[FirebaseObject]:
+    def iter_pages(
+        self,
+        model_class: Type[FirebaseObject],
+        filters: Optional[List[FieldFilter]] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        order_by: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Iterator[FirebasePage]:
+        """
+        Lazily page through a collection using `start_after` cursors.
+        Only one page of documents is held in memory at a time.
+
+        :param model_class: The class to which the documents should be mapped.
+        :param filters: Optional list of filters to apply to the query.
+        :param page_size: Number of documents fetched per round-trip.
+        :param order_by: Optional field paths to sort by (ascending). The document ID is always used as the final tie-breaker.
+            Documents missing any of these fields are not returned by Firestore.
+        :param cursor: Token from a previous `FirebasePage.cursor` to resume right after it.
+        :param fields: Optional field paths to fetch; see `fetch_all`. Order-by fields are always fetched.
+        :return: Iterator of pages, each carrying the cursor of its last document.
+        """
+        order_fields = list(order_by or [])
+        try:
+            query = self.db.collection(model_class.collection_name())
+            for filter in filters or []:
+                query = query.where(filter=filter)
+            if fields is not None:
+                # Cursor values are read from the order-by fields, so they must be part of the projection
+                query = query.select(self._projection([*fields, *order_fields]))
+            for field in order_fields:
+                query = query.order_by(field)
+            query = query.order_by("__name__").limit(page_size)
+
+            values = decode_cursor(cursor) if cursor else None
+            while True:
+                page_query = query.start_after(values) if values else query
+                documents = list(page_query.stream())
+                if not documents:
+                    return
+
+                objects = [self._to_model(model_class, doc, fields) for doc in documents]
+
+                last = documents[-1]
+                values = [last.get(field) for field in order_fields] + [last.id]
+                yield FirebasePage(items=objects, cursor=encode_cursor(values))
+
+                if len(documents) < page_size:
+                    return
+        except FirebaseServiceException:
+            raise
+        except Exception as e:
+            raise FirebaseServiceException(f"Error iterating documents from {model_class.collection_name()}: {str(e)}")
+
+    def iter_all(
+        self,
+        model_class: Type[FirebaseObject],
+        filters: Optional[List[FieldFilter]] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        order_by: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Iterator[FirebaseObject]:
+        """
+        Lazily yield every document of a collection as `model_class` instances, fetched page by page.
+        Use `iter_pages` instead when the iteration has to be checkpointed and resumed.
+
+        :param model_class: The class to which the documents should be mapped.
+        :param filters: Optional list of filters to apply to the query.
+        :param page_size: Number of documents fetched per round-trip.
+        :param order_by: Optional field paths to sort by (ascending).
+        :param cursor: Token from a previous `FirebasePage.cursor` to resume right after it.
+        :param fields: Optional field paths to fetch; see `fetch_all`.
+        :return: Iterator of objects of type `model_class`.
+        """
+        for page in self.iter_pages(model_class, filters=filters, page_size=page_size, order_by=order_by, cursor=cursor, fields=fields):
+            yield from page.items
+
+    def fetch_changed_since(
+        self,
+        model_class: Type[FirebaseObject],
+        watermark: Optional[datetime],
+        filters: Optional[List[FieldFilter]] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        clock_skew: float = DEFAULT_CLOCK_SKEW
+    ) -> FirebaseDelta:
+        """
+        Fetch the documents written after `watermark`, so periodic syncs cost proportional to churn.
+        Firestore cannot filter on its own document update time, so this relies on `model_class.UPDATED_AT_FIELD`,
+        which every write of this service stamps with the server time. Deleted documents are not reported.
+
+        Without a watermark the whole collection is returned (including documents written before the field
+        was maintained) with a watermark taken from the local clock at the start, minus `clock_skew`.
+
+        :param model_class: The class corresponding to the collection; must define UPDATED_AT_FIELD.
+        :param watermark: `FirebaseDelta.watermark` of the previous call, or None for a full sync.
+        :param filters: Optional list of equality filters to apply to the query.
+        :param page_size: Number of documents fetched per round-trip.
+        :param clock_skew: Seconds of tolerated difference between the local and the server clock.
+        :return: The changed documents and the watermark to pass next time.
+        """
+        field = model_class.UPDATED_AT_FIELD
+        if not field:
+            raise FirebaseServiceException(f"{model_class.__name__} does not define UPDATED_AT_FIELD.")
+
+        if watermark is None:
+            started = datetime.now(timezone.utc) - timedelta(seconds=clock_skew)
+            items = list(self.iter_all(model_class, filters=filters, page_size=page_size))
+            return FirebaseDelta(collection=model_class.collection_name(), items=items, watermark=started, full=True)
+
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        items = []
+        changed = [*(filters or []), FieldFilter(field, ">", watermark)]
+        for page in self.iter_pages(model_class, filters=changed, page_size=page_size, order_by=[field]):
+            items.extend(page.items)
+            # Pages are ordered by the timestamp, so the last cursor holds the newest one
+            watermark = decode_cursor(page.cursor)[0]
+        return FirebaseDelta(collection=model_class.collection_name(), items=items, watermark=watermark)
+
+    def parallel_scan(
+        self,
+        model_class: Type[FirebaseObject],
+        filters: Optional[List[FieldFilter]] = None,
+        partitions: Optional[int] = None,
+        workers: int = DEFAULT_SCAN_WORKERS,
+        callback: Optional[Callable[[FirebaseObject], None]] = None,
+        page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Iterator[FirebaseObject] | int:
+        """
+        Scan a whole collection in parallel. The collection is split into key ranges with a Firestore
+        partition query (`CollectionGroup.get_partitions`) and the ranges are paged through concurrently
+        by `workers` threads. Documents come back in no particular order.
+
+        Partition queries run on the collection group, so filters need collection-group scope indexes,
+        and only equality filters can be combined with the document-name order of the partitions.
+        Documents of same-named subcollections are skipped.
+
+        :param model_class: The class to which the documents should be mapped.
+        :param filters: Optional list of equality filters to apply to every partition.
+        :param partitions: Number of key ranges to split the collection into; more ranges than workers balance
+            uneven ranges. Defaults to four per worker. Firestore may return fewer.
+        :param workers: Number of threads fetching partitions concurrently.
+        :param callback: Called with every object from the worker threads; must be thread-safe.
+        :param page_size: Number of documents fetched per round-trip within a partition.
+        :return: Iterator of objects of type `model_class`, or the number of scanned objects when `callback` is given.
+        """
+        try:
+            group = self.db.collection_group(model_class.collection_name())
+            partitions = partitions or workers * 4
+            if partitions > 1:
+                queries = [partition.query() for partition in group.get_partitions(partitions - 1)]
+            else:
+                queries = [group.order_by("__name__")]
+        except Exception as e:
+            raise FirebaseServiceException(f"Error partitioning {model_class.collection_name()}: {str(e)}")
+
+        if callback is None:
+            return self._iter_partitions(model_class, queries, filters, workers, page_size)
+
+        stop = Event()
+
+        def scan(query) -> int:
+            scanned = 0
+            for objects in self._scan_partition(model_class, query, filters, page_size, stop):
+                for obj in objects:
+                    callback(obj)
+                scanned += len(objects)
+            return scanned
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(scan, query) for query in queries]
+            try:
+                return sum(future.result() for future in futures)
+            except Exception as e:
+                stop.set()  # Let the other partitions end after their current page
+                if isinstance(e, FirebaseServiceException):
+                    raise
+                raise FirebaseServiceException(f"Error scanning {model_class.collection_name()}: {str(e)}")
+
+    def _iter_partitions(
+        self,
+        model_class: Type[FirebaseObject],
+        queries: List[Any],
+        filters: Optional[List[FieldFilter]],
+        workers: int,
+        page_size: int
+    ) -> Iterator[FirebaseObject]:
+        """
+        Scan partitions in worker threads and yield their objects as pages arrive.
+        At most two pages per worker are buffered; closing the iterator stops the workers.
+        """
+        pages: Queue = Queue(maxsize=workers * 2)
+        stop = Event()
+        done = object()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except Full:
+                    continue
+
+        def scan(query):
+            try:
+                for objects in self._scan_partition(model_class, query, filters, page_size, stop):
+                    put(objects)
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        for query in queries:
+            executor.submit(scan, query)
+        remaining = len(queries)
+        try:
+            while remaining:
+                item = pages.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, FirebaseServiceException):
+                    raise item
+                elif isinstance(item, Exception):
+                    raise FirebaseServiceException(f"Error scanning {model_class.collection_name()}: {str(item)}")
+                else:
+                    yield from item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _scan_partition(
+        self,
+        model_class: Type[FirebaseObject],
+        query: Any,
+        filters: Optional[List[FieldFilter]],
+        page_size: int,
+        stop: Event
+    ) -> Iterator[List[FirebaseObject]]:
+        """
+        Page through one partition query (ordered by document name) with `start_after` cursors,
+        so no single stream stays open for the whole partition.
+        """
+        for filter in filters or []:
+            query = query.where(filter=filter)
+        query = query.limit(page_size)
+
+        last = None
+        while not stop.is_set():
+            page_query = query.start_after(last) if last is not None else query
+            documents = list(page_query.stream())
+            if not documents:
+                return
+            # The collection group also matches subcollections with the same name
+            yield [self._to_model(model_class, doc) for doc in documents if doc.reference.parent.parent is None]
+            if len(documents) < page_size:
+                return
+            last = documents[-1]
+
+    def fetch_by_id(self, model_class: Type[FirebaseObject], doc_id: str, fields: Optional[List[str]] = None) -> Optional[FirebaseObject]:
         """
         Fetch a single document from the specified Firestore collection by its ID
         and convert it into an object of the specified model class.
         
-        :param collection_name: Name of the Firestore collection to fetch data from.
-        :param doc_id: Document ID of the Firestore document to retrieve.
         :param model_class: The class to which the document should be mapped (e.g., User).
+        :param doc_id: Document ID of the Firestore document to retrieve.
+        :param fields: Optional field paths to fetch; see `fetch_all`. Projected reads bypass the cache.
         :return: An object of type `model_class`.
         """
+        use_cache = self.cache is not None and fields is None
+        if use_cache:
+            cached = self.cache.get(model_class, doc_id)
+            if cached is not None:
+                return cached
+
         try:
             # Access the document by ID
             doc_ref = self.db.collection(model_class.collection_name()).document(doc_id)
-            doc = doc_ref.get()  # Get the document
+            doc = doc_ref.get(field_paths=self._projection(fields) if fields is not None else None)  # Get the document
             
             if not doc.exists: # Document does not exist
                 return None
             
             # Convert the document data into an instance of the model_class
-            data = doc.to_dict()
-            data["id"] = doc.id  # Include the Firestore document ID in the data
-            
-            # Create the model instance from the data
-            return model_class(**data)  # Convert to the model (e.g., User)
+            obj = self._to_model(model_class, doc, fields)
+            if use_cache:
+                self.cache.put(obj)
+            return obj
         except Exception as e:
             raise FirebaseServiceException(f"Error fetching document from {model_class.collection_name()}: {e}")
         
+    def fetch_many(self, model_class: Type[FirebaseObject], ids: List[str], fields: Optional[List[str]] = None) -> List[Optional[FirebaseObject]]:
+        """
+        Fetch several documents by ID in a single batched read (`Client.get_all`).
+
+        :param model_class: The class to which the documents should be mapped.
+        :param ids: Document IDs to fetch. Duplicates are fetched once.
+        :param fields: Optional field paths to fetch; see `fetch_all`.
+        :return: One entry per requested ID, in input order, with None for documents that do not exist.
+        """
+        if not ids:
+            return []
+        try:
+            collection_ref = self.db.collection(model_class.collection_name())
+            refs = [collection_ref.document(doc_id) for doc_id in dict.fromkeys(ids)]
+            field_paths = self._projection(fields) if fields is not None else None
+
+            found = {}
+            for doc in self.db.get_all(refs, field_paths=field_paths):
+                if doc.exists:
+                    found[doc.id] = self._to_model(model_class, doc, fields)
+
+            return [found.get(doc_id) for doc_id in ids]
+        except Exception as e:
+            raise FirebaseServiceException(f"Error fetching documents from {model_class.collection_name()}: {str(e)}")
+
+    def fetch(self, query: FirebaseQuery) -> List[FirebaseObject]:
+        """
+        Run a composed query (filters, ordering, cursors, limits) and convert the results into model instances.
+
+        :param query: The query to run, e.g. `FirebaseQuery(Publication).where(...).order_by("updated_at", descending=True).limit(10)`.
+        :return: A list of objects of type `query.model_class`.
+        """
+        model_class = query.model_class
+        try:
+            firestore_query = query.build(self.db.collection(model_class.collection_name()))
+            # limit_to_last results are reversed client-side and cannot be streamed
+            documents = firestore_query.get() if query.limit_to_last_count is not None else firestore_query.stream()
+            return [self._to_model(model_class, doc, query.fields) for doc in documents]
+        except Exception as e:
+            raise FirebaseServiceException(f"Error fetching documents from {model_class.collection_name()}: {str(e)}")
+
     def fetch_one(self, model_class: Type[FirebaseObject], filters: Optional[List[FieldFilter]]) -> Optional[FirebaseObject]:
         """
         Fetch a single document from the specified Firestore collection and convert it into an object of type `model_class`.
+        At most two documents are read: enough to tell that the filters are not unique.
         
         :param model_class: The class to which the document should be mapped (e.g., User, Product).
         :param filters: Optional list of filters to apply to the query.
         :return: An object of type `model_class` or None if no document matches the query.
         """
 
-        objects = self.fetch_all(model_class=model_class, filters=filters)
+        objects = self.fetch(FirebaseQuery(model_class, filters).limit(2))
         if not objects:
             return None
         
         if len(objects) != 1:
-            raise FirebaseServiceException(f"Expected one document, but found {len(objects)} in {model_class.collection_name()}.")
+            raise FirebaseServiceException(f"Expected one document, but found more than one in {model_class.collection_name()}.")
         
         return objects[0]  # Return the single object found
 
+    def count(self, model_class: Type[FirebaseObject], filters: Optional[List[FieldFilter]] = None) -> int:
+        """
+        Count matching documents with a server-side aggregation query, without downloading them.
+
+        :param model_class: The class corresponding to the collection to count.
+        :param filters: Optional list of filters to apply to the query.
+        :return: Number of matching documents.
+        """
+        return int(self._aggregate(model_class, filters, lambda query: query.count(alias="value")) or 0)
+
+    def sum(self, model_class: Type[FirebaseObject], field: str, filters: Optional[List[FieldFilter]] = None) -> float:
+        """
+        Sum a numeric field over matching documents with a server-side aggregation query.
+
+        :param model_class: The class corresponding to the collection to aggregate.
+        :param field: Field path to sum. Non-numeric values are ignored by Firestore.
+        :param filters: Optional list of filters to apply to the query.
+        :return: The sum, 0 when nothing matches.
+        """
+        return self._aggregate(model_class, filters, lambda query: query.sum(field, alias="value")) or 0
+
+    def avg(self, model_class: Type[FirebaseObject], field: str, filters: Optional[List[FieldFilter]] = None) -> Optional[float]:
+        """
+        Average a numeric field over matching documents with a server-side aggregation query.
+
+        :param model_class: The class corresponding to the collection to aggregate.
+        :param field: Field path to average. Non-numeric values are ignored by Firestore.
+        :param filters: Optional list of filters to apply to the query.
+        :return: The average, or None when nothing matches.
+        """
+        return self._aggregate(model_class, filters, lambda query: query.avg(field, alias="value"))
+
+    def count_by(
+        self,
+        model_class: Type[FirebaseObject],
+        field: str,
+        values: List[Any],
+        filters: Optional[List[FieldFilter]] = None
+    ) -> Dict[Any, int]:
+        """
+        Count matching documents per value of `field`, one aggregation query per value, run concurrently.
+        Writes leave fields at their model default unset, so documents at the default usually lack the field and no
+        equality filter matches them. When the default of `field` is among `values`, its count is therefore the
+        total minus the other values, and `values` must list every value the field takes (e.g. all enum members).
+
+        :param model_class: The class corresponding to the collection to count.
+        :param field: Field to group by.
+        :param values: Values of `field` to count (e.g. all members of a status enum).
+        :param filters: Optional list of filters applied in addition to the per-value equality filter.
+        :return: Mapping of value to number of documents.
+        """
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        if not values:
+            return {}
+        model_field = model_class.model_fields.get(field)
+        default = model_field.default if model_field is not None and not model_field.is_required() else None
+        infer_default = default is not None and default in values
+        counted = [value for value in values if not (infer_default and value == default)]
+
+        jobs = [lambda value=value: self.count(model_class, [*(filters or []), FieldFilter(field, "==", self._raw(value))]) for value in counted]
+        if infer_default:
+            jobs.append(lambda: self.count(model_class, filters))
+        with ThreadPoolExecutor(max_workers=min(len(jobs), DEFAULT_BATCH_CONCURRENCY)) as executor:
+            results = list(executor.map(lambda job: job(), jobs))
+
+        counts = dict(zip(counted, results))
+        if infer_default:
+            counts[default] = results[-1] - sum(results[:len(counted)])
+        return {value: counts[value] for value in values}
+
+    def _aggregate(self, model_class: Type[FirebaseObject], filters: Optional[List[FieldFilter]], aggregation: Callable) -> Any:
+        """
+        Run a single aggregation, aliased "value", over a filtered collection and return its result.
+        """
+        try:
+            query = self.db.collection(model_class.collection_name())
+            for filter in filters or []:
+                query = query.where(filter=filter)
+            results = aggregation(query).get()
+            return results[0][0].value if results and results[0] else None
+        except Exception as e:
+            raise FirebaseServiceException(f"Error aggregating documents from {model_class.collection_name()}: {str(e)}")
+
+    def subscribe(
+        self,
+        model_class: Type[FirebaseObject],
+        filters: Optional[List[FieldFilter]] = None,
+        index_by: Optional[List[str]] = None,
+        max_documents: int = DEFAULT_MAX_DOCUMENTS,
+        on_change: Optional[Callable[[FirebaseMirror, List[Tuple[str, FirebaseObject]]], None]] = None
+    ) -> FirebaseMirror:
+        """
+        Keep an in-process mirror of a filtered query up to date through a snapshot listener.
+        Reads from the mirror cost no RPCs. Call `close()` on the mirror to stop listening.
+        Documents are hydrated with this service's hydrator; those that fail are listed in the mirror's `errors`.
+
+        :param model_class: The class to which the documents should be mapped.
+        :param filters: Optional list of filters to apply to the query.
+        :param index_by: Fields to build equality indexes for (see `FirebaseMirror.find`).
+        :param max_documents: Upper bound on mirrored documents.
+        :param on_change: Called with the applied (change type, object) pairs after every snapshot.
+        :return: The started mirror.
+        """
+        try:
+            query = self.db.collection(model_class.collection_name())
+            for filter in filters or []:
+                query = query.where(filter=filter)
+            mirror = FirebaseMirror(
+                model_class, query, index_by=index_by, max_documents=max_documents, on_change=on_change, hydrator=self.hydrator
+            )
+            return mirror.start()
+        except Exception as e:
+            raise FirebaseServiceException(f"Error subscribing to {model_class.collection_name()}: {str(e)}")
+
     def update(self, id: str, obj: FirebaseObject) -> FirebaseObject:
         """
         Update an existing document in the specified Firestore collection by its ID.
+        Tracked objects (see `track_changes`) only send the field paths changed since they were loaded,
+        and nothing at all when unchanged.
+        With a `write_buffer` the change is queued and coalesced with other updates of the same document;
+        call `flush()` before reading it back.
         
-        :param collection_name: Name of the Firestore collection.
-        :param doc_id: The ID of the document to update.
+        :param id: The ID of the document to update.
         :param obj: The object to update the document with (should be a Pydantic model).
         :return: The document ID of the updated object.
         """
@@ -180,8 +676,23 @@ class FirebaseService(FirebaseServiceInterface):
             # Convert the Pydantic model to a dictionary
             data = obj.model_dump(exclude_unset=True)  # Exclude unset fields
 
-            # Update the document in Firestore
-            doc_ref.set(data, merge=True)  # merge=True will update only the fields provided, not the entire document
+            if self.write_buffer is not None:
+                # Same semantics as below: an update of the changed paths of tracked objects, a merge of everything otherwise
+                patch = obj.dirty_fields() if obj.is_tracked else flatten(data)
+                if patch:
+                    patch.update(flatten(stamped(obj, {})))
+                    self.write_buffer.add(obj.collection_name(), id, patch, upsert=not obj.is_tracked)
+            elif obj.is_tracked:
+                # Only the field paths changed since the object was loaded
+                changes = self._field_updates(obj)
+                if changes:
+                    doc_ref.update(stamped(obj, changes))
+            else:
+                # Update the document in Firestore
+                doc_ref.set(stamped(obj, dict(data)), merge=True)  # merge=True will update only the fields provided, not the entire document
+            self._invalidate(obj.collection_name(), id)
+            if self.track_changes or obj.is_tracked:
+                obj.mark_clean()
 
             data["id"] = id
             return data  # Return the document ID of the updated object
@@ -189,6 +700,97 @@ class FirebaseService(FirebaseServiceInterface):
         except Exception as e:
             raise FirebaseServiceException(f"Error updating document with ID {id}: {str(e)}")
         
+    def transition(
+        self,
+        model_class: Type[FirebaseObject],
+        doc_id: str,
+        from_states: List[Any],
+        to_state: Any,
+        patch: Optional[Dict[str, Any]] = None,
+        max_retries: int = 5,
+        base_delay: float = 0.05,
+        max_delay: float = 2.0
+    ) -> Optional[FirebaseObject]:
+        """
+        Compare-and-set the state field (`model_class.STATE_FIELD`) of a document inside a transaction.
+        The write only happens if the current state is one of `from_states`, so concurrent workers
+        cannot both move the same document forward. Contended transactions are retried with
+        exponential backoff and full jitter; counters are kept in `transition_stats`.
+
+        :param model_class: The class corresponding to the collection, e.g. Publication or PublicationCreative.
+        :param doc_id: The ID of the document to transition.
+        :param from_states: States the document may currently be in.
+        :param to_state: State to move the document to.
+        :param patch: Optional additional fields (Firestore values) written together with the new state.
+        :param max_retries: Retries after contention before giving up.
+        :param base_delay: Initial backoff in seconds.
+        :param max_delay: Backoff cap in seconds.
+        :return: The transitioned object, or None if the document was not in one of `from_states`.
+        """
+        from firebase_admin import firestore
+        from google.api_core.exceptions import Aborted
+
+        field = model_class.STATE_FIELD
+        if not field:
+            raise FirebaseServiceException(f"{model_class.__name__} does not define STATE_FIELD.")
+
+        self.flush()  # The transaction must see buffered updates
+        allowed = {self._raw(state) for state in from_states}
+        data = {**{key: self._raw(value) for key, value in (patch or {}).items()}, field: self._raw(to_state)}
+        doc_ref = self.db.collection(model_class.collection_name()).document(doc_id)
+
+        @firestore.transactional
+        def compare_and_set(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                raise FirebaseServiceException(f"Document {model_class.collection_name()}/{doc_id} does not exist.")
+            current = snapshot.to_dict()
+            if current.get(field) not in allowed:
+                return None
+            transaction.update(doc_ref, stamped(model_class, dict(data)))
+            return {**current, **data}
+
+        for attempt in range(max_retries + 1):
+            self._record_transition("attempts")
+            try:
+                # A single attempt per transaction: retries happen here, with jitter
+                result = compare_and_set(self.db.transaction(max_attempts=1))
+            except FirebaseServiceException:
+                raise
+            except Exception as e:
+                contended = isinstance(e, Aborted) or isinstance(e.__cause__, Aborted)
+                if not contended:
+                    raise FirebaseServiceException(f"Error transitioning {model_class.collection_name()}/{doc_id}: {str(e)}")
+                self._record_transition("contentions")
+                if attempt == max_retries:
+                    break
+                time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+                continue
+
+            self._invalidate(model_class.collection_name(), doc_id)
+            if result is None:
+                self._record_transition("rejected")
+                return None
+            self._record_transition("transitions")
+            result["id"] = doc_id
+            return model_class(**result)
+
+        self._record_transition("exhausted")
+        raise FirebaseServiceException(
+            f"Transition of {model_class.collection_name()}/{doc_id} gave up after {max_retries + 1} contended attempts."
+        )
+
+    def _record_transition(self, counter: str):
+        with self._stats_lock:
+            self.transition_stats[counter] += 1
+
+    @staticmethod
+    def _raw(value: Any) -> Any:
+        """
+        Firestore stores enum members by value.
+        """
+        return value.value if isinstance(value, Enum) else value
+
     def add_to_subcollection(
         self,
         parent_collection: Type[FirebaseObject],
@@ -206,7 +808,7 @@ class FirebaseService(FirebaseServiceInterface):
         try:
             parent_ref = self.db.collection(parent_collection.collection_name()).document(parent_id)
             subcol_ref = parent_ref.collection(obj.collection_name())
-            _, doc_ref = subcol_ref.add(obj.model_dump(exclude_unset=True))
+            _, doc_ref = subcol_ref.add(stamped(obj, obj.model_dump(exclude_unset=True)))
             return doc_ref.id
         except Exception as e:
             raise FirebaseServiceException(
@@ -215,78 +817,327 @@ class FirebaseService(FirebaseServiceInterface):
             )
         
         
-    def batch_add(self, objs: List[FirebaseObject]) -> List[FirebaseObject]:
+    def batch_add(self, objs: List[FirebaseObject], concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> List[FirebaseObject]:
         """
-        Add multiple objects to Firestore in a batch operation.
+        Add multiple objects to Firestore in batch operations.
+        Objects are split into batches of at most 500 writes, committed concurrently.
         
         :param objs: List of FirebaseObject instances to add.
+        :param concurrency: Maximum number of batches committed at the same time.
         :return: List of FirebaseObject instances with assigned document IDs.
         """
         try:
-            batch = self.db.batch()
+            writes = []
             updated_objs = []
             for obj in objs:
                 collection_ref = self.db.collection(obj.collection_name())
                 doc_ref = collection_ref.document()  # auto-generated ID
-                batch.set(doc_ref, obj.model_dump(exclude_unset=True))
+                writes.append(lambda batch, ref=doc_ref, data=stamped(obj, obj.model_dump(exclude_unset=True)): batch.set(ref, data))
                 obj.id = doc_ref.id  # Assign the generated ID to the object
                 updated_objs.append(obj)
-            batch.commit()
+            self._commit_in_chunks(writes, concurrency)
             return updated_objs  # Return the list of objects with assigned IDs
         except Exception as e:
             raise FirebaseServiceException(f"Batch add failed: {str(e)}")
 
-    def batch_update(self, objs: List[FirebaseObject]) -> List[FirebaseObject]:
+    def batch_update(self, objs: List[FirebaseObject], concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> List[FirebaseObject]:
         """
-        Update multiple documents in Firestore using a batch operation.
-        Each object must have an 'id' field set.
+        Update multiple documents in Firestore using batch operations.
+        Each object must have an 'id' field set. Tracked objects only send their changed field paths.
+        Objects are split into batches of at most 500 writes, committed concurrently.
 
         :param objs: List of FirebaseObject instances to update.
+        :param concurrency: Maximum number of batches committed at the same time.
         :return: List of updated FirebaseObject instances.
         """
         try:
-            batch = self.db.batch()
+            self.flush()  # Keep buffered updates ordered before these writes
+            writes = []
             updated_objs = []
             for obj in objs:
                 if not obj.id:
                     raise FirebaseServiceException("Each object must have an ID for batch update.")
                 doc_ref = self.db.collection(obj.collection_name()).document(obj.id)
-                batch.set(doc_ref, obj.model_dump(exclude_unset=True), merge=True)
+                if obj.is_tracked:
+                    changes = self._field_updates(obj)
+                    if changes:
+                        writes.append(lambda batch, ref=doc_ref, changes=stamped(obj, changes): batch.update(ref, changes))
+                else:
+                    writes.append(lambda batch, ref=doc_ref, data=stamped(obj, obj.model_dump(exclude_unset=True)): batch.set(ref, data, merge=True))
                 updated_objs.append(obj)  # Add the updated object to the list
-            batch.commit()
+            self._commit_in_chunks(writes, concurrency)
+            for obj in updated_objs:
+                self._invalidate(obj.collection_name(), obj.id)
+                if self.track_changes or obj.is_tracked:
+                    obj.mark_clean()
             return updated_objs  # Return the list of updated objects
         except Exception as e:
             raise FirebaseServiceException(f"Batch update failed: {str(e)}")
         
-    def batch_delete(self, model_class: Type[FirebaseObject], doc_ids: List[str]) -> None:
+    def batch_delete(self, model_class: Type[FirebaseObject], doc_ids: List[str], concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> None:
         """
-        Delete multiple documents in Firestore using a batch operation.
+        Delete multiple documents in Firestore using batch operations.
+        Deletes are split into batches of at most 500 writes, committed concurrently.
         
         :param model_class: The class corresponding to the collection where documents are located.
         :param doc_ids: List of document IDs to be deleted.
+        :param concurrency: Maximum number of batches committed at the same time.
         :return: None.
         """
         try:
-            # Start a batch operation
-            batch = self.db.batch()
-            
+            writes = []
             for doc_id in doc_ids:
+                self._discard_buffered(model_class.collection_name(), doc_id)
                 # Get a reference to the document
                 doc_ref = self.db.collection(model_class.collection_name()).document(doc_id)
-                # Delete the document by adding it to the batch
-                batch.delete(doc_ref)
+                # Delete the document as part of a batch
+                writes.append(lambda batch, ref=doc_ref: batch.delete(ref))
             
-            # Commit the batch operation
-            batch.commit()
-            print(f"Successfully deleted {len(doc_ids)} documents.")
+            # Commit the batch operations
+            self._commit_in_chunks(writes, concurrency)
+            for doc_id in doc_ids:
+                self._invalidate(model_class.collection_name(), doc_id)
+            logger.info("Deleted %d documents from %s", len(doc_ids), model_class.collection_name())
 
         except Exception as e:
             raise FirebaseServiceException(f"Batch delete failed: {str(e)}")
+
+    def _commit_in_chunks(self, writes: List[Callable[[WriteBatch], None]], concurrency: int) -> None:
+        """
+        Apply queued writes in batches of at most BATCH_WRITE_LIMIT operations and commit them in parallel.
+        Batches are atomic individually, not as a whole.
+
+        :param writes: Callables adding one write each to the given batch.
+        :param concurrency: Maximum number of batches committed at the same time.
+        """
+        chunks = [writes[i:i + BATCH_WRITE_LIMIT] for i in range(0, len(writes), BATCH_WRITE_LIMIT)]
+
+        def commit(chunk):
+            batch = self.db.batch()
+            for write in chunk:
+                write(batch)
+            batch.commit()
+
+        if len(chunks) <= 1 or concurrency <= 1:
+            for chunk in chunks:
+                commit(chunk)
+            return
+
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as executor:
+            # list() re-raises the first failed commit
+            list(executor.map(commit, chunks))
+
+    def bulk_add(self, objs: List[FirebaseObject], options: Optional[BulkWriterOptions] = None, max_attempts: int = 15) -> List[FirebaseBulkWriteResult]:
+        """
+        Add any number of objects through a throttled BulkWriter.
+        Unlike batch_add, writes are not atomic and failures are reported per document.
+
+        :param objs: List of FirebaseObject instances to add. Their IDs are assigned before writing.
+        :param options: BulkWriter throttling options (initial/max ops per second).
+        :param max_attempts: Maximum number of attempts per document before it is reported as failed.
+        :return: One result per object, in input order.
+        """
+        self.flush()  # Keep buffered updates ordered before these writes
+        operations = []
+        for obj in objs:
+            doc_ref = self.db.collection(obj.collection_name()).document()  # auto-generated ID
+            obj.id = doc_ref.id
+            operations.append((doc_ref, lambda writer, ref=doc_ref, data=stamped(obj, obj.model_dump(exclude_unset=True)): writer.create(ref, data)))
+        return self._bulk_write(operations, options, max_attempts)
+
+    def bulk_update(self, objs: List[FirebaseObject], options: Optional[BulkWriterOptions] = None, max_attempts: int = 15) -> List[FirebaseBulkWriteResult]:
+        """
+        Merge any number of objects into their documents through a throttled BulkWriter.
+        Each object must have an 'id' field set.
+
+        :param objs: List of FirebaseObject instances to update.
+        :param options: BulkWriter throttling options (initial/max ops per second).
+        :param max_attempts: Maximum number of attempts per document before it is reported as failed.
+        :return: One result per object, in input order.
+        """
+        self.flush()  # Keep buffered updates ordered before these writes
+        operations = []
+        for obj in objs:
+            if not obj.id:
+                raise FirebaseServiceException("Each object must have an ID for bulk update.")
+            doc_ref = self.db.collection(obj.collection_name()).document(obj.id)
+            operations.append((doc_ref, lambda writer, ref=doc_ref, data=stamped(obj, obj.model_dump(exclude_unset=True)): writer.set(ref, data, merge=True)))
+        return self._bulk_write(operations, options, max_attempts)
+
+    def bulk_delete(self, model_class: Type[FirebaseObject], doc_ids: List[str], options: Optional[BulkWriterOptions] = None, max_attempts: int = 15) -> List[FirebaseBulkWriteResult]:
+        """
+        Delete any number of documents through a throttled BulkWriter.
+
+        :param model_class: The class corresponding to the collection where documents are located.
+        :param doc_ids: List of document IDs to be deleted.
+        :param options: BulkWriter throttling options (initial/max ops per second).
+        :param max_attempts: Maximum number of attempts per document before it is reported as failed.
+        :return: One result per document ID, in input order.
+        """
+        operations = []
+        for doc_id in doc_ids:
+            self._discard_buffered(model_class.collection_name(), doc_id)  # Pending updates must not recreate it
+            doc_ref = self.db.collection(model_class.collection_name()).document(doc_id)
+            operations.append((doc_ref, lambda writer, ref=doc_ref: writer.delete(ref)))
+        return self._bulk_write(operations, options, max_attempts)
+
+    def _bulk_write(self, operations: List[Tuple[DocumentReference, Callable[[BulkWriter], None]]], options: Optional[BulkWriterOptions], max_attempts: int) -> List[FirebaseBulkWriteResult]:
+        """
+        Run operations through a BulkWriter and collect a result for every document.
+
+        :param operations: Pairs of document reference and a callable enqueueing its write.
+        :param options: BulkWriter throttling options.
+        :param max_attempts: Maximum number of attempts per document.
+        :return: One result per operation, in input order.
+        """
+        outcomes: Dict[str, FirebaseBulkWriteResult] = {}
+        lock = Lock()
+
+        def on_result(reference, result, writer):
+            with lock:
+                previous = outcomes.get(reference.path)
+                outcomes[reference.path] = FirebaseBulkWriteResult(
+                    collection=reference.parent.id,
+                    doc_id=reference.id,
+                    success=True,
+                    attempts=previous.attempts + 1 if previous else 1,
+                )
+
+        def on_error(failure, writer) -> bool:
+            reference = failure.operation.reference
+            with lock:
+                outcomes[reference.path] = FirebaseBulkWriteResult(
+                    collection=reference.parent.id,
+                    doc_id=reference.id,
+                    success=False,
+                    error=f"{failure.code}: {failure.message}",
+                    attempts=failure.attempts + 1,  # BulkWriter counts previous attempts, from 0
+                )
+            return failure.attempts + 1 < max_attempts  # True schedules a retry
+
+        try:
+            writer = self.db.bulk_writer(options=options)
+            writer.on_write_result(on_result)
+            writer.on_write_error(on_error)
+            for _, enqueue in operations:
+                enqueue(writer)
+            writer.close()  # Flushes all pending writes and waits for retries
+        except Exception as e:
+            raise FirebaseServiceException(f"Bulk write failed: {str(e)}")
+        finally:
+            for doc_ref, _ in operations:
+                self._invalidate(doc_ref.parent.id, doc_ref.id)
+
+        results = []
+        for doc_ref, _ in operations:
+            result = outcomes.get(doc_ref.path)
+            if result is None:
+                result = FirebaseBulkWriteResult(
+                    collection=doc_ref.parent.id,
+                    doc_id=doc_ref.id,
+                    success=False,
+                    error="No result reported by BulkWriter",
+                )
+            results.append(result)
+        return results
         
+    @staticmethod
+    def _field_updates(obj: FirebaseObject) -> Dict[str, Any]:
+        """
+        Changed fields of a tracked object as a Firestore `update()` payload with escaped dotted field paths.
+        """
+        from firebase_admin import firestore
+        from google.cloud.firestore_v1.field_path import FieldPath
+        return {
+            FieldPath(*path).to_api_repr(): firestore.DELETE_FIELD if value is DELETED else value
+            for path, value in obj.dirty_fields().items()
+        }
+
+    def flush(self):
+        """
+        Write the updates pending in the write buffer now, for call sites that need to read their own writes.
+        No-op without a write buffer.
+        """
+        if self.write_buffer is not None:
+            self.write_buffer.flush()
+
+    def _commit_buffered(self, entries: Dict[Tuple[str, str], Dict[Tuple[str, ...], Any]], upserts: Set[Tuple[str, str]]):
+        """
+        Write coalesced updates flushed by the write buffer, limited to their changed field paths: a merge-set
+        for entries in `upserts`, an update (which fails for missing documents) for the others.
+        A missing document fails its whole batch; the documents of such batches are then written one by one
+        and updates of missing documents are dropped with a warning, so they are not retried forever.
+        """
+        from firebase_admin import firestore
+        from google.api_core.exceptions import NotFound
+        from google.cloud.firestore_v1.field_path import FieldPath
+
+        writes = []
+        for key, patch in entries.items():
+            collection, doc_id = key
+            doc_ref = self.db.collection(collection).document(doc_id)
+            if key in upserts:
+                data: Dict[str, Any] = {}
+                for path, value in patch.items():
+                    target = data
+                    for part in path[:-1]:
+                        target = target.setdefault(part, {})
+                    target[path[-1]] = firestore.DELETE_FIELD if value is DELETED else value
+                merge = [FieldPath(*path) for path in patch]
+                writes.append(lambda batch, ref=doc_ref, data=data, merge=merge: batch.set(ref, data, merge=merge))
+            else:
+                updates = {FieldPath(*path).to_api_repr(): firestore.DELETE_FIELD if value is DELETED else value for path, value in patch.items()}
+                writes.append(lambda batch, ref=doc_ref, updates=updates: batch.update(ref, updates))
+        try:
+            self._commit_in_chunks(writes, DEFAULT_BATCH_CONCURRENCY)
+        except NotFound:
+            for (collection, doc_id), write in zip(entries, writes):
+                try:
+                    self._commit_in_chunks([write], 1)
+                except NotFound:
+                    logger.warning("Dropped buffered update of missing document %s/%s", collection, doc_id)
+        for collection, doc_id in entries:
+            self._invalidate(collection, doc_id)
+
+    def _discard_buffered(self, collection: str, doc_id: str):
+        if self.write_buffer is not None:
+            self.write_buffer.discard(collection, doc_id)
+
+    def _invalidate(self, collection: str, doc_id: str):
+        """
+        Drop a written document from the read-through cache, if one is configured.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(collection, doc_id)
+
+    @staticmethod
+    def _projection(fields: List[str]) -> List[str]:
+        """
+        Turn requested model fields into Firestore field paths. The document ID is not a stored field;
+        an ids-only projection selects the document name, since an empty `select` returns every field.
+        """
+        return list(dict.fromkeys(field for field in fields if field != "id")) or ["__name__"]
+
+    def _to_model(self, model_class: Type[FirebaseObject], doc: DocumentSnapshot, fields: Optional[List[str]] = None) -> FirebaseObject:
+        """
+        Convert a Firestore document snapshot into an instance of `model_class` through the hydrator.
+        Projected documents are always constructed without validation, since required fields may be missing.
+        """
+        data = self.hydrator.read(doc)
+        data["id"] = doc.id  # Include the document ID
+        obj = construct_model(model_class, data) if fields is not None else self.hydrator.hydrate(model_class, data)
+        if self.track_changes:
+            obj.mark_clean()
+        return obj
+
     def close_db(self):
         """
-        Close the Firestore database connection.
+        Close the Firestore database connection, writing any buffered updates first.
+        Nothing is opened if the client was never used.
         """
-        self.db.close()
+        if self.write_buffer is not None:
+            self.write_buffer.close()
+        if self._db is not None:
+            self._db.close()
 
     
\ No newline at end of file
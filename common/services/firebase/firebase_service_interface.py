@@ -1,8 +1,12 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from typing import List, Type, Optional
-from google.cloud.firestore_v1.base_query import FieldFilter
+from typing import TYPE_CHECKING, List, Type, Optional
 from common.services.firebase.firebase_object import FirebaseObject
 
+if TYPE_CHECKING:
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
 # Abstract base class for Firebase service
 class FirebaseServiceInterface(ABC):
 
@@ -11,7 +15,11 @@ class FirebaseServiceInterface(ABC):
         pass
 
     @abstractmethod
-    def delete(self, collection_name: str, document_id: str):
+    def add_with_doc_id(self, doc_id: str, obj: FirebaseObject) -> FirebaseObject:
+        pass
+
+    @abstractmethod
+    def delete(self, model_class: Type[FirebaseObject], doc_id: str):
         pass
 
     @abstractmethod
@@ -22,10 +30,30 @@ class FirebaseServiceInterface(ABC):
     def fetch_by_id(self, model_class: Type[FirebaseObject], doc_id: str) -> FirebaseObject:
         pass
 
+    @abstractmethod
+    def fetch_one(self, model_class: Type[FirebaseObject], filters: Optional[List[FieldFilter]]) -> Optional[FirebaseObject]:
+        pass
+
     @abstractmethod
     def update(self, id: str, obj: FirebaseObject) -> FirebaseObject:
         pass
 
+    @abstractmethod
+    def add_to_subcollection(self, parent_collection: Type[FirebaseObject], parent_id: str, obj: FirebaseObject) -> str:
+        pass
+
+    @abstractmethod
+    def batch_add(self, objs: List[FirebaseObject], concurrency: int = 4) -> List[FirebaseObject]:
+        pass
+
+    @abstractmethod
+    def batch_update(self, objs: List[FirebaseObject], concurrency: int = 4) -> List[FirebaseObject]:
+        pass
+
+    @abstractmethod
+    def batch_delete(self, model_class: Type[FirebaseObject], doc_ids: List[str], concurrency: int = 4) -> None:
+        pass
+
     @abstractmethod
     def close_db(self):
         pass
@@ -0,0 +1,96 @@
+import sqlite3
+from datetime import datetime
+from threading import Lock
+from typing import Iterator, List, Optional, Type
+from common.services.firebase.firebase_delta import FirebaseDelta
+from common.services.firebase.firebase_object import FirebaseObject
+from common.services.firebase.firebase_service_exception import FirebaseServiceException
+
+# Local SQLite copy of collections, kept current by applying deltas from FirebaseService.fetch_changed_since.
+# Documents are stored as JSON together with the watermark of every collection, so a restarted process
+# continues with an incremental sync.
+class FirebaseSnapshotStore:
+    def __init__(self, path: str = ":memory:"):
+        """
+        :param path: SQLite database file, or ":memory:".
+        """
+        self.path = path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "collection TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL, PRIMARY KEY (collection, id)"
+                ") WITHOUT ROWID"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS watermarks (collection TEXT PRIMARY KEY, watermark TEXT NOT NULL)")
+
+    def sync(self, service, model_class: Type[FirebaseObject]) -> FirebaseDelta:
+        """
+        Fetch the changes since the stored watermark and apply them.
+
+        :param service: FirebaseService to read from.
+        :param model_class: The collection to sync.
+        :return: The applied delta.
+        """
+        delta = service.fetch_changed_since(model_class, self.watermark(model_class))
+        self.apply(delta)
+        return delta
+
+    def apply(self, delta: FirebaseDelta) -> int:
+        """
+        Upsert the documents of a delta and store its watermark, in one transaction.
+        A full delta replaces the stored collection, which also drops documents deleted since.
+
+        :return: Number of written documents.
+        """
+        rows = [(delta.collection, obj.id, obj.model_dump_json(exclude_unset=True)) for obj in delta.items]
+        try:
+            with self._lock, self._conn:
+                if delta.full:
+                    self._conn.execute("DELETE FROM documents WHERE collection = ?", (delta.collection,))
+                self._conn.executemany("INSERT OR REPLACE INTO documents (collection, id, data) VALUES (?, ?, ?)", rows)
+                if delta.watermark is not None:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO watermarks (collection, watermark) VALUES (?, ?)",
+                        (delta.collection, delta.watermark.isoformat())
+                    )
+        except sqlite3.Error as e:
+            raise FirebaseServiceException(f"Error applying delta of {delta.collection}: {str(e)}")
+        return len(rows)
+
+    def watermark(self, model_class: Type[FirebaseObject]) -> Optional[datetime]:
+        row = self._fetchone("SELECT watermark FROM watermarks WHERE collection = ?", (model_class.collection_name(),))
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def get(self, model_class: Type[FirebaseObject], doc_id: str) -> Optional[FirebaseObject]:
+        row = self._fetchone("SELECT data FROM documents WHERE collection = ? AND id = ?", (model_class.collection_name(), doc_id))
+        return model_class.model_validate_json(row[0]) if row else None
+
+    def all(self, model_class: Type[FirebaseObject]) -> Iterator[FirebaseObject]:
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM documents WHERE collection = ? ORDER BY id", (model_class.collection_name(),)).fetchall()
+        for (data,) in rows:
+            yield model_class.model_validate_json(data)
+
+    def count(self, model_class: Type[FirebaseObject]) -> int:
+        return self._fetchone("SELECT COUNT(*) FROM documents WHERE collection = ?", (model_class.collection_name(),))[0]
+
+    def remove(self, model_class: Type[FirebaseObject], doc_ids: List[str]):
+        """
+        Drop documents known to be deleted; deltas do not report deletions.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM documents WHERE collection = ? AND id = ?",
+                [(model_class.collection_name(), doc_id) for doc_id in doc_ids]
+            )
+
+    def close(self):
+        self._conn.close()
+
+    def _fetchone(self, sql: str, params: tuple):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
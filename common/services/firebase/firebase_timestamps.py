@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Type
+from common.services.firebase.firebase_object import FirebaseObject
+
+
+def server_timestamp() -> Any:
+    """
+    Firestore sentinel replaced by the commit time of the write.
+    """
+    from firebase_admin import firestore
+    return firestore.SERVER_TIMESTAMP
+
+
+def stamped(model_class: Type[FirebaseObject] | FirebaseObject, data: Dict[str, Any], timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Add the write time under `UPDATED_AT_FIELD` to a write payload, for models that maintain one.
+    Every write path of the services goes through here, so `fetch_changed_since` sees all of their writes.
+
+    :param timestamp: Time to store; the Firestore server timestamp by default.
+    """
+    if model_class.UPDATED_AT_FIELD:
+        data[model_class.UPDATED_AT_FIELD] = timestamp if timestamp is not None else server_timestamp()
+    return data
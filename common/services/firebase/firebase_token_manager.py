@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+SECURE_TOKEN_URL = "https://securetoken.googleapis.com/v1/token?key={api_key}"
+DEFAULT_REFRESH_MARGIN = 300.0  # Seconds before expiry at which a cached ID token is refreshed
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+def _cache_key(api_key: str, refresh_token: str) -> str:
+    # Refresh tokens are credentials: only their hash is kept as a key
+    return hashlib.sha256(f"{api_key}\0{refresh_token}".encode()).hexdigest()
+
+
+def _parse_response(status_code: int, text: str, payload: Any) -> Dict[str, Any]:
+    if status_code != 200:
+        raise RuntimeError(f"SecureToken refresh failed: {status_code} {text}")
+    return payload
+
+
+# Cached Secure Token responses with their expiry, shared logic of the sync and async managers
+class _TokenCache:
+    def __init__(self, refresh_margin: float, max_entries: int):
+        self.refresh_margin = refresh_margin
+        self.max_entries = max_entries
+        self.hits = 0
+        self.refreshes = 0
+        self.collapsed = 0  # Callers that waited for a refresh already in flight
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        The cached response with `expires_in` set to the remaining lifetime, or None when missing or about to expire.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, expires_at = entry
+            remaining = expires_at - time.monotonic()
+            if remaining <= self.refresh_margin:
+                return None
+            self._entries.move_to_end(key)
+        return {**response, "expires_in": str(int(remaining))}
+
+    def put(self, key: str, response: Dict[str, Any]):
+        expires_at = time.monotonic() + float(response.get("expires_in", 0))
+        with self._lock:
+            self._entries[key] = (response, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, api_key: str, refresh_token: str):
+        with self._lock:
+            self._entries.pop(_cache_key(api_key, refresh_token), None)
+
+    def invalidate_user(self, uid: str):
+        """
+        Drop every cached token of a user, e.g. after their custom claims changed.
+        """
+        with self._lock:
+            for key in [key for key, (response, _) in self._entries.items() if response.get("user_id") == uid]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "refreshes": self.refreshes, "collapsed": self.collapsed, "size": len(self._entries)}
+
+
+# Exchanges refresh tokens for ID tokens through the Secure Token API over a pooled requests.Session.
+# Responses are cached until `refresh_margin` seconds before they expire, and concurrent refreshes
+# of the same token share one request.
+class FirebaseTokenManager(_TokenCache):
+    def __init__(
+        self,
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+        timeout: float = DEFAULT_TIMEOUT,
+        pool_size: int = 10,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        """
+        :param refresh_margin: Seconds before expiry at which a cached ID token is refreshed instead of returned.
+        :param timeout: Timeout of a Secure Token API request in seconds.
+        :param pool_size: Connections kept open to the Secure Token API.
+        :param max_entries: Cached tokens; the least recently used are dropped first.
+        """
+        super().__init__(refresh_margin, max_entries)
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self._inflight: Dict[str, threading.Lock] = {}
+
+    def refresh_id_token(self, api_key: str, refresh_token: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Same result as the Secure Token API (`id_token`, `refresh_token`, `expires_in`, ...), served from the cache when possible.
+
+        :param force: Skip the cache and always request a new token, e.g. so that it carries just updated claims.
+        """
+        key = _cache_key(api_key, refresh_token)
+        cached = None if force else self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        with self._lock:
+            flight = self._inflight.setdefault(key, threading.Lock())
+        if not flight.acquire(blocking=False):
+            # Another thread is refreshing this token: wait for it and use its result
+            self.collapsed += 1
+            flight.acquire()
+        try:
+            # A forced refresh must not reuse a token requested before it was called
+            cached = None if force else self.get(key)
+            if cached is not None:
+                return cached
+            self.refreshes += 1
+            r = self._session.post(
+                SECURE_TOKEN_URL.format(api_key=api_key),
+                data={"grant_type": "refresh_token", "refresh_token": refresh_token},
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                timeout=self.timeout
+            )
+            response = _parse_response(r.status_code, r.text, r.json() if r.status_code == 200 else None)
+            self.put(key, response)
+            return response
+        finally:
+            flight.release()
+            with self._lock:
+                if self._inflight.get(key) is flight and not flight.locked():
+                    del self._inflight[key]
+
+    def close(self):
+        self._session.close()
+
+
+# asyncio variant of FirebaseTokenManager over a pooled httpx.AsyncClient.
+# Concurrent refreshes of the same token await one shared task.
+class AsyncFirebaseTokenManager(_TokenCache):
+    def __init__(
+        self,
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+        timeout: float = DEFAULT_TIMEOUT,
+        pool_size: int = 10,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        """
+        :param refresh_margin: Seconds before expiry at which a cached ID token is refreshed instead of returned.
+        :param timeout: Timeout of a Secure Token API request in seconds.
+        :param pool_size: Connections kept open to the Secure Token API.
+        :param max_entries: Cached tokens; the least recently used are dropped first.
+        """
+        super().__init__(refresh_margin, max_entries)
+        import httpx
+
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def refresh_id_token(self, api_key: str, refresh_token: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Same result as the Secure Token API (`id_token`, `refresh_token`, `expires_in`, ...), served from the cache when possible.
+
+        :param force: Skip the cache and always request a new token, e.g. so that it carries just updated claims.
+        """
+        key = _cache_key(api_key, refresh_token)
+        cached = None if force else self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        # A forced refresh does not join a request started before it was called
+        task = None if force else self._inflight.get(key)
+        if task is not None:
+            self.collapsed += 1
+        else:
+            task = asyncio.ensure_future(self._refresh(key, api_key, refresh_token))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._inflight.pop(key) if self._inflight.get(key) is done else None)
+        # Shielded: a cancelled caller must not cancel the refresh other callers are waiting for
+        return await asyncio.shield(task)
+
+    async def _refresh(self, key: str, api_key: str, refresh_token: str) -> Dict[str, Any]:
+        self.refreshes += 1
+        r = await self._client.post(
+            SECURE_TOKEN_URL.format(api_key=api_key),
+            data={"grant_type": "refresh_token", "refresh_token": refresh_token}
+        )
+        response = _parse_response(r.status_code, r.text, r.json() if r.status_code == 200 else None)
+        self.put(key, response)
+        return response
+
+    async def close(self):
+        await self._client.aclose()
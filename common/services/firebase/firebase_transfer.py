@@ -0,0 +1,142 @@
+import json
+import os
+import typing
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional, Type
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+from common.services.firebase.firebase_object import FirebaseObject
+from common.services.firebase.firebase_service_exception import FirebaseServiceException
+
+# Column kinds of the Parquet layout: native Arrow types, everything else as a JSON string
+STRING, BOOL, INT, FLOAT, TIMESTAMP, JSON = "string", "bool", "int", "float", "timestamp", "json"
+
+
+# Progress of an export or import, reported after every page or chunk and returned at the end
+class FirebaseTransferProgress(BaseModel):
+    collection: str
+    documents: int = 0       # Documents transferred, including those of resumed runs
+    resumed_from: int = 0    # Documents already transferred when this run started
+    elapsed: float = 0.0     # Seconds spent in this run
+    cursor: Optional[str] = None
+    done: bool = False
+
+    @property
+    def docs_per_sec(self) -> float:
+        return (self.documents - self.resumed_from) / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def read_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_checkpoint(path: str, state: Dict[str, Any]):
+    """
+    Replace the checkpoint atomically, so an interrupted run never leaves a partial one.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def clear_checkpoint(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def require_pyarrow():
+    """
+    pyarrow is an optional dependency (`pip install creogen-common[parquet]`).
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise FirebaseServiceException("Parquet support requires pyarrow: pip install creogen-common[parquet]")
+    return pyarrow, pyarrow.parquet
+
+
+def parquet_columns(model_class: Type[FirebaseObject]) -> Dict[str, str]:
+    """
+    Column kind of every model field, `id` first. Nested models, lists and maps are stored as JSON strings,
+    so every part file of a collection has the same schema regardless of its contents.
+    """
+    columns = {"id": STRING}
+    for name, field in model_class.model_fields.items():
+        if name != "id":
+            columns[name] = _column_kind(field.annotation)
+    return columns
+
+
+def parquet_schema(model_class: Type[FirebaseObject]):
+    pa, _ = require_pyarrow()
+    types = {
+        STRING: pa.string(), BOOL: pa.bool_(), INT: pa.int64(), FLOAT: pa.float64(),
+        TIMESTAMP: pa.timestamp("us", tz="UTC"), JSON: pa.string(),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in parquet_columns(model_class).items()])
+
+
+def to_parquet_row(obj: FirebaseObject, columns: Dict[str, str]) -> Dict[str, Any]:
+    row = {}
+    for name, kind in columns.items():
+        value = getattr(obj, name, None)
+        if value is None:
+            row[name] = None
+        elif kind == JSON:
+            row[name] = json.dumps(to_jsonable_python(value, exclude_none=True), ensure_ascii=False)
+        elif isinstance(value, Enum):
+            row[name] = value.value
+        else:
+            row[name] = value
+    return row
+
+
+def from_parquet_row(row: Dict[str, Any], columns: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Turn a Parquet row back into model data. Nulls are dropped: Parquet cannot tell them from unset fields.
+    """
+    data = {}
+    for name, value in row.items():
+        if value is None:
+            continue
+        data[name] = json.loads(value) if columns.get(name) == JSON else value
+    return data
+
+
+def part_files(directory: str) -> List[str]:
+    """
+    Part files of a Parquet export, in write order.
+    """
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.startswith("part-") and name.endswith(".parquet")
+    )
+
+
+def _column_kind(annotation: Any) -> str:
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if typing.get_origin(annotation) is not None and len(args) == 1 and typing.get_origin(annotation) not in (list, dict, set, tuple):
+        annotation = args[0]  # Optional[X]
+    if not isinstance(annotation, type):
+        return JSON
+    if issubclass(annotation, Enum):
+        return STRING
+    if issubclass(annotation, bool):
+        return BOOL
+    if issubclass(annotation, int):
+        return INT
+    if issubclass(annotation, float):
+        return FLOAT
+    if issubclass(annotation, str):
+        return STRING
+    if issubclass(annotation, datetime):
+        return TIMESTAMP
+    return JSON
@@ -0,0 +1,164 @@
+import copy
+import logging
+from collections import OrderedDict
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+from common.services.firebase.firebase_service_exception import FirebaseServiceException
+from common.services.firebase.firebase_object import DELETED
+
+logger = logging.getLogger(__name__)
+
+FieldPathParts = Tuple[str, ...]
+DocumentKey = Tuple[str, str]  # (collection name, document ID)
+
+
+def flatten(data: Dict[str, Any], prefix: FieldPathParts = ()) -> Dict[FieldPathParts, Any]:
+    """
+    Turn a `set(..., merge=True)` payload into leaf field paths: nested maps are merged, not replaced.
+    """
+    paths = {}
+    for key, value in data.items():
+        if isinstance(value, dict) and value:
+            paths.update(flatten(value, (*prefix, key)))
+        else:
+            paths[(*prefix, key)] = value
+    return paths
+
+
+# Write-behind buffer that coalesces field updates per document and flushes them in batches
+# when `max_pending` documents are waiting, every `flush_interval` seconds, on `flush()` and on `close()`.
+# A document is only created by its pending write if one of the coalesced patches was an upsert.
+class FirebaseWriteBuffer:
+    def __init__(self, max_pending: int = 500, flush_interval: float = 1.0):
+        """
+        :param max_pending: Number of buffered documents that triggers a flush in the writing thread.
+        :param flush_interval: Seconds between background flushes. 0 disables the background flusher.
+        """
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.buffered = 0   # Patches received
+        self.coalesced = 0  # Patches merged into an already pending document
+        self.written = 0    # Documents written
+        self.flushes = 0
+        self._pending: "OrderedDict[DocumentKey, Dict[FieldPathParts, Any]]" = OrderedDict()
+        self._upserts: Set[DocumentKey] = set()
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._commit: Optional[Callable[[Dict[DocumentKey, Dict[FieldPathParts, Any]], Set[DocumentKey]], None]] = None
+
+    def start(self, commit: Callable[[Dict[DocumentKey, Dict[FieldPathParts, Any]], Set[DocumentKey]], None]):
+        """
+        Attach the function writing flushed entries and start the background flusher.
+        Called by FirebaseService with the flushed entries and the keys of those that may create their document.
+        """
+        self._commit = commit
+        if self.flush_interval > 0 and self._thread is None:
+            self._thread = Thread(target=self._run, name="firebase-write-buffer", daemon=True)
+            self._thread.start()
+
+    def add(self, collection: str, doc_id: str, patch: Dict[FieldPathParts, Any], upsert: bool = True):
+        """
+        Merge field updates into the pending write of a document. Later values win.
+
+        :param upsert: Whether the patch may create the document (a merge-set) or requires it to exist (an update).
+        """
+        with self._lock:
+            key = (collection, doc_id)
+            self.buffered += 1
+            if upsert:
+                self._upserts.add(key)
+            if key in self._pending:
+                self.coalesced += 1
+                self._merge(self._pending[key], patch)
+            else:
+                self._pending[key] = dict(patch)
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self.flush()
+
+    def discard(self, collection: str, doc_id: str):
+        """
+        Drop the pending write of a document, e.g. because it is being deleted.
+        """
+        with self._lock:
+            self._pending.pop((collection, doc_id), None)
+            self._upserts.discard((collection, doc_id))
+
+    def flush(self):
+        """
+        Write all pending updates now. On failure they are put back, under any newer updates, and the error is raised.
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries, self._pending = self._pending, OrderedDict()
+                upserts, self._upserts = self._upserts, set()
+            if not entries:
+                return
+            try:
+                self._commit(entries, upserts)
+            except Exception as e:
+                with self._lock:
+                    self._upserts |= upserts
+                    for key, patch in entries.items():
+                        newer = self._pending.pop(key, None)
+                        self._pending[key] = patch
+                        if newer:
+                            self._merge(patch, newer)
+                raise FirebaseServiceException(f"Flushing buffered writes failed: {str(e)}")
+            self.written += len(entries)
+            self.flushes += 1
+
+    def close(self):
+        """
+        Stop the background flusher and write everything still pending.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": self.buffered,
+            "coalesced": self.coalesced,
+            "written": self.written,
+            "flushes": self.flushes,
+            "pending": len(self),
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except FirebaseServiceException as e:
+                logger.warning(str(e))  # Entries stay pending and are retried on the next flush
+
+    @staticmethod
+    def _merge(entry: Dict[FieldPathParts, Any], patch: Dict[FieldPathParts, Any]):
+        for path, value in patch.items():
+            # A newer value for a path replaces everything below it
+            for existing in [p for p in entry if p[:len(path)] == path]:
+                del entry[existing]
+            # A newer value below an already written path is applied inside that path's value
+            ancestor = next((p for p in entry if len(p) < len(path) and path[:len(p)] == p), None)
+            if ancestor is None:
+                entry[path] = value
+                continue
+            container = copy.deepcopy(entry[ancestor]) if isinstance(entry[ancestor], dict) else {}
+            target = container
+            for key in path[len(ancestor):-1]:
+                if not isinstance(target.get(key), dict):
+                    target[key] = {}
+                target = target[key]
+            if value is DELETED:
+                target.pop(path[-1], None)
+            else:
+                target[path[-1]] = value
+            entry[ancestor] = container
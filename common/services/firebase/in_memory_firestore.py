@@ -0,0 +1,581 @@
+from __future__ import annotations
+
+import bisect
+import copy
+import time
+import uuid
+from datetime import datetime, timezone
+from enum import Enum
+from threading import RLock
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from google.api_core.exceptions import NotFound
+from google.cloud.firestore_v1 import DELETE_FIELD, SERVER_TIMESTAMP
+from google.cloud.firestore_v1.base_query import FieldFilter
+from google.cloud.firestore_v1.field_path import FieldPath, parse_field_path
+
+# Sort order of values of different types, as in Firestore
+_TYPE_ORDER = [(type(None), 0), (bool, 1), ((int, float), 2), (datetime, 3), (str, 4), (bytes, 5), (list, 7), (dict, 8)]
+
+
+# In-memory stand-in for the Firestore Client, injected into FirebaseService (`client=`) for tests and
+# offline benchmarks, so the service's own code runs unchanged. Every call that would be one RPC
+# (a document read or write, a query, `get_all`, a batch commit) sleeps `latency` seconds.
+#
+# Supported: collections and subcollections, `document`/`add`/`get`/`set` (including merge and merge
+# field paths)/`update`/`delete`, queries with `where`/`select`/`order_by`/cursors/`limit`/
+# `limit_to_last`/`count`, `get_all` and write batches. Transactions, BulkWriter, collection groups
+# (and with them `get_partitions`) and snapshot listeners raise NotImplementedError, so the service
+# methods built on them (`transition`, `bulk_*`, `parallel_scan`, `subscribe`) cannot run on it.
+class InMemoryFirestoreClient:
+    def __init__(self, latency: float = 0.0):
+        """
+        :param latency: Simulated round-trip time in seconds.
+        """
+        self.latency = latency
+        self.collections: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.round_trips = 0
+        self._sorted_ids: Dict[str, List[str]] = {}  # Document IDs per collection, rebuilt after inserts and deletes
+        self._lock = RLock()
+
+    def collection(self, path: str) -> _CollectionReference:
+        return _CollectionReference(self, path)
+
+    def document(self, path: str) -> _DocumentReference:
+        collection, doc_id = path.rsplit("/", 1)
+        return _DocumentReference(self, collection, doc_id)
+
+    def batch(self) -> _WriteBatch:
+        return _WriteBatch(self)
+
+    def transaction(self, **kwargs):
+        _unsupported("Transactions")
+
+    def bulk_writer(self, **kwargs):
+        _unsupported("BulkWriter")
+
+    def collection_group(self, collection_id: str):
+        _unsupported("Collection groups")
+
+    def get_all(self, references: List[_DocumentReference], field_paths: Optional[List[str]] = None, transaction=None) -> Iterator[_DocumentSnapshot]:
+        self._round_trip()
+        with self._lock:
+            snapshots = [reference._snapshot(field_paths) for reference in references]
+        return iter(snapshots)
+
+    def close(self):
+        pass
+
+    def _round_trip(self):
+        self.round_trips += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _read(self, collection: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        return self.collections.get(collection, {}).get(doc_id)
+
+    def _write(self, collection: str, doc_id: str, data: Optional[Dict[str, Any]]):
+        """
+        Replace (or with None, delete) a stored document. Stored documents are never modified in place.
+        """
+        documents = self.collections.setdefault(collection, {})
+        if data is None:
+            if documents.pop(doc_id, None) is not None:
+                self._sorted_ids.pop(collection, None)
+            return
+        if doc_id not in documents:
+            self._sorted_ids.pop(collection, None)
+        documents[doc_id] = data
+
+    def _ids(self, collection: str) -> List[str]:
+        if collection not in self._sorted_ids:
+            self._sorted_ids[collection] = sorted(self.collections.get(collection, {}))
+        return self._sorted_ids[collection]
+
+
+# A write of a batch or a single document call, applied under the client lock
+class _Write:
+    def __init__(self, reference: _DocumentReference, kind: str, data: Optional[Dict[str, Any]] = None, merge: Any = False):
+        self.reference = reference
+        self.kind = kind  # "create", "set", "update" or "delete"
+        self.data = data
+        self.merge = merge
+
+    def apply(self, now: datetime):
+        client, collection, doc_id = self.reference._client, self.reference._collection, self.reference.id
+        current = client._read(collection, doc_id)
+        if self.kind == "delete":
+            client._write(collection, doc_id, None)
+            return
+        if self.kind == "create" and current is not None:
+            raise ValueError(f"Document already exists: {self.reference.path}")
+        if self.kind == "update" and current is None:
+            raise NotFound(f"No document to update: {self.reference.path}")
+
+        if self.kind == "update":
+            document = _copy(current)
+            for key, value in self.data.items():
+                _set_path(document, parse_field_path(key), value, now)
+        elif self.merge is True:
+            document = _copy(current) if current is not None else {}
+            _merge(document, self.data, now)
+        elif self.merge:
+            document = _copy(current) if current is not None else {}
+            for path in self.merge:
+                parts = path.parts if isinstance(path, FieldPath) else parse_field_path(path)
+                found, value = _get_path(self.data, parts)
+                if found:
+                    _set_path(document, parts, value, now)
+        else:
+            document = {}
+            _merge(document, self.data, now)
+        client._write(collection, doc_id, document)
+
+
+class _DocumentReference:
+    def __init__(self, client: InMemoryFirestoreClient, collection: str, doc_id: str):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def path(self) -> str:
+        return f"{self._collection}/{self.id}"
+
+    @property
+    def parent(self) -> _CollectionReference:
+        return _CollectionReference(self._client, self._collection)
+
+    def collection(self, name: str) -> _CollectionReference:
+        return _CollectionReference(self._client, f"{self.path}/{name}")
+
+    def get(self, field_paths: Optional[List[str]] = None, transaction=None) -> _DocumentSnapshot:
+        self._client._round_trip()
+        with self._client._lock:
+            return self._snapshot(field_paths)
+
+    def create(self, document_data: Dict[str, Any]):
+        self._commit(_Write(self, "create", document_data))
+
+    def set(self, document_data: Dict[str, Any], merge: Any = False):
+        self._commit(_Write(self, "set", document_data, merge))
+
+    def update(self, field_updates: Dict[str, Any]):
+        self._commit(_Write(self, "update", field_updates))
+
+    def delete(self):
+        self._commit(_Write(self, "delete"))
+
+    def on_snapshot(self, callback: Callable):
+        _unsupported("Snapshot listeners")
+
+    def _commit(self, write: _Write):
+        self._client._round_trip()
+        with self._client._lock:
+            write.apply(datetime.now(timezone.utc))
+
+    def _snapshot(self, field_paths: Optional[List[str]] = None) -> _DocumentSnapshot:
+        data = self._client._read(self._collection, self.id)
+        return _DocumentSnapshot(self, _project(data, field_paths) if data is not None else None)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _DocumentReference) and other._client is self._client and other.path == self.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+
+class _DocumentSnapshot:
+    def __init__(self, reference: _DocumentReference, data: Optional[Dict[str, Any]]):
+        self.reference = reference
+        self._data = data
+
+    @property
+    def id(self) -> str:
+        return self.reference.id
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data)
+
+    def get(self, field_path: str) -> Any:
+        found, value = _get_path(self._data or {}, parse_field_path(field_path))
+        if not found:
+            raise KeyError(field_path)
+        return _copy(value)
+
+
+class _Query:
+    def __init__(self, client: InMemoryFirestoreClient, collection: str):
+        self._client = client
+        self._collection = collection
+        self._filters: List[FieldFilter] = []
+        self._fields: Optional[List[str]] = None
+        self._orders: List[Tuple[str, str]] = []
+        self._cursors: List[Tuple[str, Any]] = []
+        self._limit: Optional[int] = None
+        self._limit_to_last = False
+
+    def where(self, field_path: Optional[str] = None, op_string: Optional[str] = None, value: Any = None, filter: Optional[FieldFilter] = None) -> _Query:
+        return self._with(lambda q: q._filters.append(filter if filter is not None else FieldFilter(field_path, op_string, value)))
+
+    def select(self, field_paths: List[str]) -> _Query:
+        return self._with(lambda q: setattr(q, "_fields", list(field_paths)))
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> _Query:
+        return self._with(lambda q: q._orders.append((field_path, direction)))
+
+    def start_at(self, values: Any) -> _Query:
+        return self._with(lambda q: q._cursors.append(("start_at", values)))
+
+    def start_after(self, values: Any) -> _Query:
+        return self._with(lambda q: q._cursors.append(("start_after", values)))
+
+    def end_at(self, values: Any) -> _Query:
+        return self._with(lambda q: q._cursors.append(("end_at", values)))
+
+    def end_before(self, values: Any) -> _Query:
+        return self._with(lambda q: q._cursors.append(("end_before", values)))
+
+    def limit(self, count: int) -> _Query:
+        return self._with(lambda q: (setattr(q, "_limit", count), setattr(q, "_limit_to_last", False)))
+
+    def limit_to_last(self, count: int) -> _Query:
+        return self._with(lambda q: (setattr(q, "_limit", count), setattr(q, "_limit_to_last", True)))
+
+    def count(self, alias: Optional[str] = None) -> _CountQuery:
+        return _CountQuery(self, alias)
+
+    def on_snapshot(self, callback: Callable):
+        _unsupported("Snapshot listeners")
+
+    def stream(self, transaction=None) -> Iterator[_DocumentSnapshot]:
+        if self._limit_to_last:
+            raise ValueError("Query results for queries that include limit_to_last() constraints cannot be streamed. Use Query.get() instead.")
+        return iter(self.get())
+
+    def get(self, transaction=None) -> List[_DocumentSnapshot]:
+        self._client._round_trip()
+        with self._client._lock:
+            rows = self._run()
+            return [_DocumentReference(self._client, self._collection, doc_id)._snapshot(self._fields) for doc_id in rows]
+
+    def _run(self) -> List[str]:
+        """
+        IDs of the matching documents in query order.
+        """
+        orders = [*self._orders]
+        if not orders or orders[-1][0] != "__name__":
+            # Firestore orders by the document ID last, in the direction of the last explicit ordering
+            orders.append(("__name__", orders[-1][1] if orders else "ASCENDING"))
+        documents = self._client.collections.get(self._collection, {})
+        cursors = [(method, self._cursor_values(values, orders)) for method, values in self._cursors]
+        limit = None if self._limit_to_last else self._limit
+
+        if len(orders) == 1 and orders[0][1] == "ASCENDING":
+            # Default order: walk the sorted IDs from the start cursor and stop at the limit
+            ids = self._client._ids(self._collection)
+            start = 0
+            for method, values in cursors:
+                if method == "start_at":
+                    start = max(start, bisect.bisect_left(ids, values[0]))
+                elif method == "start_after":
+                    start = max(start, bisect.bisect_right(ids, values[0]))
+            candidates = ((doc_id, documents[doc_id]) for doc_id in ids[start:])
+            cursors = [(method, values) for method, values in cursors if method.startswith("end")]
+        else:
+            candidates = sorted(
+                ((doc_id, data) for doc_id, data in documents.items() if all(_get_path(data, parse_field_path(field))[0] for field, _ in orders[:-1])),
+                key=lambda row: self._sort_key(row, orders)
+            )
+
+        matches = []
+        for doc_id, data in candidates:
+            if not all(_matches(data, filter) for filter in self._filters):
+                continue
+            if self._within(doc_id, data, orders, cursors):
+                matches.append(doc_id)
+                if limit is not None and len(matches) >= limit:
+                    break
+        if self._limit_to_last and self._limit is not None:
+            matches = matches[-self._limit:] if self._limit else []
+        return matches
+
+    def _within(self, doc_id: str, data: Dict[str, Any], orders: List[Tuple[str, str]], cursors: List[Tuple[str, List[Any]]]) -> bool:
+        if not cursors:
+            return True
+        key = self._sort_key((doc_id, data), orders)
+        for method, values in cursors:
+            # A cursor may give fewer values than there are orderings: compare that prefix
+            compared = _compare(key[:len(values)], self._sort_key((None, None), orders[:len(values)], values))
+            if method == "start_at" and compared < 0 or method == "start_after" and compared <= 0:
+                return False
+            if method == "end_at" and compared > 0 or method == "end_before" and compared >= 0:
+                return False
+        return True
+
+    @staticmethod
+    def _sort_key(row: Tuple[Optional[str], Optional[Dict[str, Any]]], orders: List[Tuple[str, str]], values: Optional[List[Any]] = None) -> Tuple:
+        doc_id, data = row
+        key = []
+        for i, (field, direction) in enumerate(orders):
+            if values is not None:
+                value = values[i] if i < len(values) else None
+            else:
+                value = doc_id if field == "__name__" else _get_path(data, parse_field_path(field))[1]
+            key.append(_Descending(_rank(value)) if direction == "DESCENDING" else _rank(value))
+        return tuple(key)
+
+    @staticmethod
+    def _cursor_values(values: Any, orders: List[Tuple[str, str]]) -> List[Any]:
+        """
+        Cursor as a list of order-by values. Snapshots and dicts are read at the order-by fields.
+        """
+        if isinstance(values, _DocumentSnapshot):
+            data, doc_id = values._data or {}, values.id
+        elif isinstance(values, dict):
+            data, doc_id = values, values.get("__name__")
+        else:
+            values = [value.id if isinstance(value, _DocumentReference) else value for value in values]
+            return [value.rsplit("/", 1)[-1] if isinstance(value, str) and field == "__name__" else value for value, (field, _) in zip(values, orders)]
+        return [doc_id if field == "__name__" else _get_path(data, parse_field_path(field))[1] for field, _ in orders]
+
+    def _with(self, change: Callable[[_Query], Any]) -> _Query:
+        clone = copy.copy(self)
+        clone._filters = list(self._filters)
+        clone._orders = list(self._orders)
+        clone._cursors = list(self._cursors)
+        change(clone)
+        return clone
+
+
+class _CollectionReference(_Query):
+    def __init__(self, client: InMemoryFirestoreClient, path: str):
+        super().__init__(client, path)
+
+    @property
+    def id(self) -> str:
+        return self._collection.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self) -> Optional[_DocumentReference]:
+        if "/" not in self._collection:
+            return None
+        return self._client.document(self._collection.rsplit("/", 1)[0])
+
+    def document(self, document_id: Optional[str] = None) -> _DocumentReference:
+        return _DocumentReference(self._client, self._collection, document_id or uuid.uuid4().hex[:20])
+
+    def add(self, document_data: Dict[str, Any], document_id: Optional[str] = None) -> Tuple[datetime, _DocumentReference]:
+        reference = self.document(document_id)
+        reference.create(document_data)
+        return datetime.now(timezone.utc), reference
+
+
+class _CountQuery:
+    def __init__(self, query: _Query, alias: Optional[str]):
+        self._query = query
+        self._alias = alias or "field_1"
+
+    def get(self, transaction=None) -> List[List[Any]]:
+        self._query._client._round_trip()
+        with self._query._client._lock:
+            count = len(self._query._run())
+        return [[_AggregationResult(self._alias, count)]]
+
+
+class _AggregationResult:
+    def __init__(self, alias: str, value: Any):
+        self.alias = alias
+        self.value = value
+
+
+class _WriteBatch:
+    def __init__(self, client: InMemoryFirestoreClient):
+        self._client = client
+        self._writes: List[_Write] = []
+
+    def create(self, reference: _DocumentReference, document_data: Dict[str, Any]):
+        self._writes.append(_Write(reference, "create", document_data))
+
+    def set(self, reference: _DocumentReference, document_data: Dict[str, Any], merge: Any = False):
+        self._writes.append(_Write(reference, "set", document_data, merge))
+
+    def update(self, reference: _DocumentReference, field_updates: Dict[str, Any]):
+        self._writes.append(_Write(reference, "update", field_updates))
+
+    def delete(self, reference: _DocumentReference):
+        self._writes.append(_Write(reference, "delete"))
+
+    def commit(self) -> List[Any]:
+        """
+        Apply all writes atomically, in one round trip.
+        """
+        self._client._round_trip()
+        with self._client._lock:
+            previous: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+            now = datetime.now(timezone.utc)
+            try:
+                for write in self._writes:
+                    key = (write.reference._collection, write.reference.id)
+                    if key not in previous:
+                        previous[key] = self._client._read(*key)
+                    write.apply(now)
+            except Exception:
+                for (collection, doc_id), data in previous.items():
+                    self._client._write(collection, doc_id, data)
+                raise
+        return [now] * len(self._writes)
+
+
+class _Descending:
+    """
+    Inverts the order of a sort key component.
+    """
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __lt__(self, other: _Descending) -> bool:
+        return other.value < self.value
+
+    def __gt__(self, other: _Descending) -> bool:
+        return other.value > self.value
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _Descending) and self.value == other.value
+
+
+def _rank(value: Any) -> Tuple[int, Any]:
+    """
+    Sort key of a value across types.
+    """
+    for types, rank in _TYPE_ORDER:
+        if isinstance(value, types):
+            if isinstance(value, list):
+                return rank, tuple(_rank(item) for item in value)
+            if isinstance(value, dict):
+                return rank, tuple(sorted((key, _rank(item)) for key, item in value.items()))
+            return rank, value if value is not None else 0
+    return 6, str(value)
+
+
+def _compare(left: Tuple, right: Tuple) -> int:
+    return -1 if left < right else 1 if left > right else 0
+
+
+def _encode(value: Any, now: datetime) -> Any:
+    """
+    Stored form of a written value: sentinels resolved, enums as their values, copied containers.
+    """
+    if value is SERVER_TIMESTAMP:
+        return now
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {key: _encode(item, now) for key, item in value.items() if item is not DELETE_FIELD}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item, now) for item in value]
+    return value
+
+
+def _copy(value: Any) -> Any:
+    """
+    Copy of stored data. Much cheaper than `copy.deepcopy`, which `_DocumentSnapshot.to_dict` keeps using like the real client.
+    """
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value  # Scalars and datetimes are immutable
+
+
+def _merge(target: Dict[str, Any], patch: Dict[str, Any], now: datetime):
+    """
+    `set(..., merge=True)` semantics: nested maps are merged, everything else replaced.
+    """
+    for key, value in patch.items():
+        if value is DELETE_FIELD:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value, now)
+        else:
+            target[key] = _encode(value, now)
+
+
+def _get_path(data: Any, parts: List[str]) -> Tuple[bool, Any]:
+    for part in parts:
+        if not isinstance(data, dict) or part not in data:
+            return False, None
+        data = data[part]
+    return True, data
+
+
+def _set_path(data: Dict[str, Any], parts: List[str], value: Any, now: datetime):
+    for part in parts[:-1]:
+        if not isinstance(data.get(part), dict):
+            data[part] = {}
+        data = data[part]
+    if value is DELETE_FIELD:
+        data.pop(parts[-1], None)
+    else:
+        data[parts[-1]] = _encode(value, now)
+
+
+def _unsupported(feature: str):
+    raise NotImplementedError(f"{feature} are not supported by InMemoryFirestoreClient")
+
+
+def _project(data: Dict[str, Any], field_paths: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Copy of a stored document, limited to `field_paths` when given. As in Firestore, an empty list selects every field.
+    """
+    if not field_paths:
+        return _copy(data)
+    projected: Dict[str, Any] = {}
+    for field_path in field_paths:
+        parts = parse_field_path(field_path)
+        found, value = _get_path(data, parts)
+        if found:
+            target = projected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = _copy(value)
+    return projected
+
+
+def _matches(data: Dict[str, Any], filter: FieldFilter) -> bool:
+    """
+    Evaluate a FieldFilter against a document. As in Firestore, documents missing the field never match.
+    """
+    found, value = _get_path(data, parse_field_path(filter.field_path))
+    if not found:
+        return False
+
+    op, expected = filter.op_string, filter.value
+    expected = expected.value if isinstance(expected, Enum) else expected
+    try:
+        if op == "==":
+            return value == expected
+        if op == "!=":
+            return value != expected
+        if op == "<":
+            return value < expected
+        if op == "<=":
+            return value <= expected
+        if op == ">":
+            return value > expected
+        if op == ">=":
+            return value >= expected
+        if op == "in":
+            return value in expected
+        if op == "not-in":
+            return value not in expected
+        if op == "array_contains":
+            return isinstance(value, list) and expected in value
+        if op == "array_contains_any":
+            return isinstance(value, list) and any(item in value for item in expected)
+    except TypeError:
+        return False  # Firestore does not compare values of different types
+    raise ValueError(f"Unsupported filter operator: {op}")
@@ -1,35 +1,312 @@
 import asyncio
-from openai import OpenAI
+import inspect
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
 from common.services.openai.openai_service_interface import OpenaiServiceInterface
+from common.services.openai.translation_cache import TranslationCache
+from common.services.openai.text_chunker import estimate_tokens, split_text
+
+if TYPE_CHECKING:
+    from common.models.project import Script
+    from common.services.firebase.async_firebase_service_interface import AsyncFirebaseServiceInterface
+    from common.services.firebase.firebase_service_interface import FirebaseServiceInterface
+    from common.services.openai.translation_result import TranslationResult
+
+BASE_URL = "https://api.deepseek.com"
+MODEL = "deepseek-chat"
+DEFAULT_MAX_CONCURRENCY = 64    # Requests in flight at the same time
+DEFAULT_MAX_CONNECTIONS = 100   # Size of the shared HTTP connection pool
+DEFAULT_TIMEOUT = 120.0         # Seconds per request
+DEFAULT_CONTEXT_CHARS = 200     # Neighbouring text passed with every chunk of a chunked translation
 
 class OpenAIService(OpenaiServiceInterface):
 
-    def __init__(self, api_key: str):
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.deepseek.com"
-        )
-
-    async def _prompt(self, system_prompt: str, user_prompt: str, temperature: float = 1.0):
-        # Offload the synchronous call to a separate thread
-        chat_completion = await asyncio.to_thread(
-            self.client.chat.completions.create,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=temperature,
-            model="deepseek-chat"
-        )
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache: Optional[TranslationCache] = None
+    ):
+        """
+        :param api_key: DeepSeek API key.
+        :param max_concurrency: Maximum number of requests in flight; further calls wait for a slot.
+        :param max_connections: Connections kept in the shared HTTP pool (all of them may stay alive).
+        :param timeout: Default timeout of a request in seconds; `_prompt` accepts a per-call value.
+        :param cache: Optional translation cache; repeated translations are then served without a request.
+
+        The HTTP client and the concurrency limit are bound to an event loop. The service keeps one of each per
+        running loop, so an instance can be reused across `asyncio.run` calls; those of closed loops are dropped.
+        Call `close()` before a loop ends to release its connections.
+        """
+        self._api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.cache = cache
+        self._clients: Dict[asyncio.AbstractEventLoop, Any] = {}
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    @property
+    def client(self):
+        """
+        Client of the running event loop.
+        """
+        loop = self._running_loop()
+        # The openai package is slow to import: load it and build the client on first request
+        if loop not in self._clients:
+            import httpx
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+            self._clients[loop] = AsyncOpenAI(
+                api_key=self._api_key,
+                base_url=BASE_URL,
+                timeout=self.timeout,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+                )
+            )
+        return self._clients[loop]
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """
+        Concurrency limit of the running event loop.
+        """
+        loop = self._running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+
+    def _running_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if loop not in self._clients and loop not in self._semaphores:
+            # A new loop, e.g. another asyncio.run: forget what belonged to loops that are gone
+            for closed in [other for other in {*self._clients, *self._semaphores} if other.is_closed()]:
+                self._clients.pop(closed, None)
+                self._semaphores.pop(closed, None)
+        return loop
+
+    async def _prompt(self, system_prompt: str, user_prompt: str, temperature: float = 1.0, timeout: Optional[float] = None):
+        # Native async request: waiting for the API holds a semaphore slot, not a thread
+        async with self.semaphore:
+            chat_completion = await self.client.chat.completions.create(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temperature,
+                model=MODEL,
+                timeout=timeout if timeout is not None else self.timeout
+            )
         return chat_completion.choices[0].message.content
 
+    async def _prompt_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 1.0,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        # Yields content deltas as they arrive. The response is closed however the iteration ends,
+        # so an abandoned generation stops instead of running (and being billed) to the end.
+        async with self.semaphore:
+            stream = await self.client.chat.completions.create(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temperature,
+                model=MODEL,
+                timeout=timeout if timeout is not None else self.timeout,
+                stream=True
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+
+    async def translate_script(self, content: str, target_language: str, chunk_tokens: Optional[int] = None) -> str:
+        """
+        :param content: Text to translate.
+        :param target_language: Language to translate into.
+        :param chunk_tokens: When set and the text is longer (about 4 characters per token), split it at
+            paragraph and sentence boundaries into chunks of this size, translate them concurrently with a little
+            neighbouring text as context, and join the results in order.
+        """
+        if chunk_tokens is None or estimate_tokens(content) <= chunk_tokens:
+            return await self._translate(content, target_language)
+
+        chunks = split_text(content, chunk_tokens)
+        translations = await asyncio.gather(*(
+            self._translate(
+                chunk,
+                target_language,
+                before=chunks[i - 1][0][-DEFAULT_CONTEXT_CHARS:] if i > 0 else "",
+                after=chunks[i + 1][0][:DEFAULT_CONTEXT_CHARS] if i + 1 < len(chunks) else ""
+            )
+            for i, (chunk, _) in enumerate(chunks)
+        ))
+        return "".join(translation + separator for translation, (_, separator) in zip(translations, chunks)).strip()
+
+    async def translate_script_many(
+        self,
+        content: str,
+        target_languages: List[str],
+        chunk_tokens: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        firebase_service: Optional["FirebaseServiceInterface | AsyncFirebaseServiceInterface"] = None,
+        script: Optional["Script"] = None
+    ) -> Dict[str, "TranslationResult"]:
+        """
+        Translate one script into several languages concurrently. All requests share the service's
+        concurrency budget; a failing language is reported in its result and does not affect the others.
+
+        :param content: Text to translate.
+        :param target_languages: Languages to translate into; duplicates are ignored.
+        :param chunk_tokens: Chunk size for long scripts, see `translate_script`.
+        :param concurrency: Optional limit of languages translated at the same time by this call.
+        :param firebase_service: Sync or async service to persist the translations with, as Script documents in one batch write.
+        :param script: Source Script whose name, user and project the persisted translations get. Required with `firebase_service`.
+        :return: Result per language, in the order of `target_languages`. When persisting fails, the translations are
+            still returned, with the error recorded and no `script_id`.
+        """
+        # pydantic is slow to import: only load the result model when it is used
+        from common.services.openai.translation_result import TranslationResult
+
+        # Checked before any request is paid for
+        if firebase_service is not None and script is None:
+            raise ValueError("The source script is required to persist translations.")
+
+        languages = list(dict.fromkeys(target_languages))
+        limit = asyncio.Semaphore(concurrency) if concurrency else None
+        started = time.perf_counter()
 
-    async def translate_script(self, content: str, target_language: str) -> str:
+        async def translate(language: str) -> "TranslationResult":
+            try:
+                if limit is None:
+                    text = await self.translate_script(content, language, chunk_tokens=chunk_tokens)
+                else:
+                    async with limit:
+                        text = await self.translate_script(content, language, chunk_tokens=chunk_tokens)
+                return TranslationResult(language=language, text=text, latency=time.perf_counter() - started)
+            except Exception as e:
+                return TranslationResult(language=language, error=str(e), latency=time.perf_counter() - started)
+
+        results = await asyncio.gather(*(translate(language) for language in languages))
+
+        if firebase_service is not None:
+            from common.models.project import Script
+
+            translated = [result for result in results if result.text is not None]
+            scripts = [
+                Script(user_id=script.user_id, project_id=script.project_id, name=script.name, language=result.language, content=result.text)
+                for result in translated
+            ]
+            if scripts:
+                try:
+                    if inspect.iscoroutinefunction(firebase_service.batch_add):
+                        await firebase_service.batch_add(scripts)
+                    else:
+                        # The sync Firestore client blocks: keep the event loop free while the batch commits
+                        await asyncio.to_thread(firebase_service.batch_add, scripts)
+                except Exception as e:
+                    # Keep the paid-for translations: report the failure on each of them instead of raising
+                    for result in translated:
+                        result.error = f"Saving the translation failed: {e}"
+                else:
+                    for result, saved in zip(translated, scripts):
+                        result.script_id = saved.id
+
+        return {result.language: result for result in results}
+
+    async def translate_script_stream(
+        self,
+        content: str,
+        target_language: str,
+        cancel_event: Optional[asyncio.Event] = None
+    ) -> AsyncIterator[str]:
+        """
+        Translate a script and yield the translation piece by piece as the model produces it.
+        The concatenated pieces equal the result of `translate_script`. Stop early by closing the generator
+        (e.g. `aclose()` or cancelling the consuming task when the client disconnects) or by setting `cancel_event`;
+        the request is then aborted.
+
+        :param content: Text to translate.
+        :param target_language: Language to translate into.
+        :param cancel_event: Optional event checked between pieces; when set, the generation is aborted.
+        """
+        temperature = 1.0
+        system = self._system_prompt(target_language)
+        key = None
+        if self.cache is not None:
+            key = TranslationCache.key(content, target_language, MODEL, system, temperature)
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                yield cached
+                return
+
+        pieces = []
+        pending = ""  # Whitespace held back, since the end of the result is stripped
+        stream = self._prompt_stream(system, content, temperature)
+        try:
+            async for delta in stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                if not pieces:
+                    delta = delta.lstrip()
+                body = delta.rstrip()
+                if body:
+                    piece = pending + body
+                    pieces.append(piece)
+                    pending = delta[len(body):]
+                    yield piece
+                elif pieces:
+                    pending += delta
+        finally:
+            await stream.aclose()
+
+        if key is not None and pieces:
+            await self.cache.aput(key, "".join(pieces))
+
+    @staticmethod
+    def _system_prompt(target_language: str, before: str = "", after: str = "") -> str:
         system = f"""
 Translate the following text into {target_language} while preserving the original meaning and context.
 Translate it like a native speaker would, ensuring that the translation is natural and fluent.
 In the result write only the translated text without any additional comments or explanations.
 """
+        if before or after:
+            system += f"""
+The text is a part of a longer script. The surrounding text is given only for context: do not translate it or include it in the result.
+Text before: {before}
+Text after: {after}
+"""
+        return system
+
+    async def _translate(self, content: str, target_language: str, before: str = "", after: str = "") -> str:
+        temperature = 1.0
+        system = self._system_prompt(target_language, before, after)
+
+        key = None
+        if self.cache is not None:
+            key = TranslationCache.key(content, target_language, MODEL, system, temperature)
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached
+
+        result = await self._prompt(system, content, temperature)
+        result = result.strip()
+        if key is not None:
+            await self.cache.aput(key, result)
+        return result
 
-        result = await self._prompt(system, content)
-        return result.strip()
\ No newline at end of file
+    async def close(self):
+        """
+        Close the pooled HTTP connections of the running event loop.
+        """
+        client = self._clients.pop(self._running_loop(), None)
+        if client is not None:
+            await client.close()
@@ -1,7 +1,19 @@
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List
+
+if TYPE_CHECKING:
+    from common.services.openai.translation_result import TranslationResult
 
 # Abstract base class for Firebase service
 class OpenaiServiceInterface(ABC):
     @abstractmethod
     async def translate_script(self, content: str, target_language: str) -> str:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def translate_script_many(self, content: str, target_languages: List[str]) -> Dict[str, "TranslationResult"]:
+        pass
+
+    @abstractmethod
+    def translate_script_stream(self, content: str, target_language: str) -> AsyncIterator[str]:
+        pass
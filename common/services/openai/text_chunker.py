@@ -0,0 +1,70 @@
+import re
+from typing import List, Pattern, Tuple
+
+# Rough token estimate used for budgeting: about 4 characters per token
+CHARS_PER_TOKEN = 4
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?…。！？])\s+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_text(content: str, max_tokens: int) -> List[Tuple[str, str]]:
+    """
+    Split text into chunks of at most `max_tokens` (estimated), cutting at paragraph breaks,
+    then at sentence ends, and only inside sentences that are longer than the budget on their own.
+
+    :return: (chunk, separator) pairs, where the separator is the whitespace up to the next chunk. Joining every
+        chunk followed by its separator gives back the content; content without any text gives no chunks.
+    """
+    units: List[Tuple[int, int]] = []
+    for start, end in _spans(_PARAGRAPH_BREAK, content, 0, len(content)):
+        if estimate_tokens(content[start:end]) <= max_tokens:
+            units.append((start, end))
+            continue
+        for sentence_start, sentence_end in _spans(_SENTENCE_END, content, start, end):
+            if estimate_tokens(content[sentence_start:sentence_end]) <= max_tokens:
+                units.append((sentence_start, sentence_end))
+            else:
+                units.extend(_spans(_WHITESPACE, content, sentence_start, sentence_end))
+
+    chunks = _merge(content, units, max_tokens)
+    pairs = []
+    for i, (start, end) in enumerate(chunks):
+        next_start = chunks[i + 1][0] if i + 1 < len(chunks) else len(content)
+        # Whitespace before the first chunk has no preceding separator to go into
+        pairs.append((content[0 if i == 0 else start:end], content[end:next_start]))
+    return pairs
+
+
+def _spans(separator: Pattern, content: str, start: int, end: int) -> List[Tuple[int, int]]:
+    """
+    Positions of the parts of `content[start:end]` between matches of `separator`, without surrounding whitespace.
+    Parts that are only whitespace are left out.
+    """
+    spans = []
+    position = start
+    bounds = [(match.start(), match.end()) for match in separator.finditer(content, start, end)] + [(end, end)]
+    for match_start, match_end in bounds:
+        part = content[position:match_start]
+        if part.strip():
+            spans.append((position + len(part) - len(part.lstrip()), match_start - len(part) + len(part.rstrip())))
+        position = match_end
+    return spans
+
+
+def _merge(content: str, units: List[Tuple[int, int]], max_tokens: int) -> List[Tuple[int, int]]:
+    """
+    Greedily join consecutive units, with the text between them, while the result stays within the budget.
+    """
+    chunks: List[Tuple[int, int]] = []
+    for start, end in units:
+        if chunks and estimate_tokens(content[chunks[-1][0]:end]) <= max_tokens:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+    return chunks
@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_TTL = 30 * 24 * 3600.0  # Seconds; translations do not go stale quickly
+PURGE_EVERY = 1_000  # Disk writes between removals of expired rows
+
+# Content-addressed cache of translations: an in-memory LRU tier in front of an optional SQLite tier.
+# Entries are keyed by a hash of everything that determines the model output, and expire after `ttl` seconds.
+# `aget`/`aput` serve memory hits inline and run the disk tier in a worker thread, for use on an event loop.
+class TranslationCache:
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL):
+        """
+        :param path: SQLite file of the disk tier; None keeps the cache in memory only.
+        :param max_entries: Entries of the in-memory tier; the least recently used are dropped first.
+        :param ttl: Lifetime of an entry in seconds.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()       # Memory tier and counters; never held during disk I/O
+        self._disk_lock = threading.Lock()  # SQLite connection
+        self._writes = 0
+        self._conn = None
+        if path is not None:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+
+    @staticmethod
+    def key(content: str, target_language: str, model: str, system_prompt: str, temperature: float) -> str:
+        raw = json.dumps([content, target_language, model, system_prompt, temperature], ensure_ascii=False)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._memory_get(key)
+        if value is None and self._conn is not None:
+            value = self._disk_get(key)
+        if value is None:
+            with self._lock:
+                self.misses += 1
+        return value
+
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        Same as `get`, without blocking the event loop on the disk tier.
+        """
+        value = self._memory_get(key)
+        if value is None and self._conn is not None:
+            value = await asyncio.to_thread(self._disk_get, key)
+        if value is None:
+            with self._lock:
+                self.misses += 1
+        return value
+
+    def put(self, key: str, value: str):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self._conn is not None:
+            self._disk_put(key, value, expires_at)
+
+    async def aput(self, key: str, value: str):
+        """
+        Same as `put`, without blocking the event loop on the disk tier. The entry is visible in memory right away.
+        """
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self._conn is not None:
+            await asyncio.to_thread(self._disk_put, key, value, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        with self._disk_lock:
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM translations")
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+    def close(self):
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            return None
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        with self._disk_lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute("SELECT value, expires_at FROM translations WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        with self._lock:
+            self._remember(key, row[0], row[1])
+            self.disk_hits += 1
+        return row[0]
+
+    def _disk_put(self, key: str, value: str, expires_at: float):
+        with self._disk_lock:
+            if self._conn is None:
+                return
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO translations (key, value, expires_at) VALUES (?, ?, ?)", (key, value, expires_at))
+                self._writes += 1
+                if self._writes % PURGE_EVERY == 0:
+                    self._conn.execute("DELETE FROM translations WHERE expires_at <= ?", (time.time(),))
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
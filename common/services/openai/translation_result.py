@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Optional
+
+# Outcome for one language of OpenAIService.translate_script_many
+class TranslationResult(BaseModel):
+    language: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+    latency: float = 0.0  # Seconds from start of the call until this language finished
+    script_id: Optional[str] = None  # ID of the persisted Script document, if persisted
@@ -8,6 +8,11 @@ setup(
         'firebase-admin',
         'pydantic',
         'openai',
-        'openpyxl'
+        'openpyxl',
+        'requests',  # Firebase token exchange
+        'httpx',     # Async Firebase token exchange
     ],
+    extras_require={
+        'parquet': ['pyarrow'],  # Parquet export/import
+    },
 )
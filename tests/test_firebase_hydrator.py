@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+from google.auth.credentials import AnonymousCredentials
+from google.cloud.firestore_v1 import Client, DocumentReference, DocumentSnapshot
+from common.services.firebase.firebase_hydrator import FirebaseHydrator
+
+
+def sdk_snapshot(data) -> DocumentSnapshot:
+    client = Client(project="test", credentials=AnonymousCredentials())
+    reference = DocumentReference("readings", "reading-1", client=client)
+    return DocumentSnapshot(reference, data, exists=True, read_time=None, create_time=None, update_time=None)
+
+
+def test_trusted_read_shares_nested_values_with_the_sdk_snapshot():
+    doc = sdk_snapshot({"name": "Intro", "metadata": {"lang": "en"}})
+
+    data = FirebaseHydrator(trusted=True).read(doc)
+    data["id"] = doc.id
+
+    assert "id" not in doc.to_dict()
+    assert data["metadata"] is doc._data["metadata"]
+
+
+def test_default_read_copies_the_sdk_snapshot():
+    doc = sdk_snapshot({"name": "Intro", "metadata": {"lang": "en"}})
+
+    data = FirebaseHydrator().read(doc)
+
+    assert data == doc.to_dict()
+    assert data["metadata"] is not doc._data["metadata"]
+
+
+def test_trusted_read_falls_back_to_to_dict_without_snapshot_data():
+    doc = SimpleNamespace(id="reading-1", to_dict=lambda: {"name": "Intro"})
+
+    assert FirebaseHydrator(trusted=True).read(doc) == {"name": "Intro"}
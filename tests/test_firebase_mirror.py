@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+from common.models.project import Project
+from common.services.firebase.firebase_hydrator import FirebaseHydrator
+from common.services.firebase.firebase_mirror import ADDED, MODIFIED, FirebaseMirror
+
+
+class SnapshotQuery:
+    def __init__(self):
+        self.callback = None
+
+    def on_snapshot(self, callback):
+        self.callback = callback
+        return SimpleNamespace(unsubscribe=lambda: None)
+
+    def deliver(self, *changes):
+        self.callback([], [
+            SimpleNamespace(type=SimpleNamespace(name=change_type), document=SimpleNamespace(id=doc_id, to_dict=lambda data=data: data))
+            for change_type, doc_id, data in changes
+        ], None)
+
+
+def test_invalid_documents_are_recorded_without_dropping_the_snapshot():
+    query = SnapshotQuery()
+    hydrator = FirebaseHydrator()
+    mirror = FirebaseMirror(Project, query, index_by=["user_id"], hydrator=hydrator).start()
+
+    query.deliver((ADDED, "p1", {"name": "One", "user_id": "u1"}), (ADDED, "p2", {"user_id": "u1"}))
+
+    assert mirror.wait_ready(0)
+    assert [project.id for project in mirror.find("user_id", "u1")] == ["p1"]
+    assert list(mirror.errors) == ["p2"]
+    assert hydrator.hydrated == 2
+
+    query.deliver((MODIFIED, "p1", {"user_id": "u1"}), (MODIFIED, "p2", {"name": "Two", "user_id": "u1"}))
+
+    assert [project.id for project in mirror.find("user_id", "u1")] == ["p2"]
+    assert list(mirror.errors) == ["p1"]
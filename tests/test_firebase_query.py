@@ -0,0 +1,19 @@
+from unittest.mock import MagicMock
+from common.models.project import Project
+from common.services.firebase.firebase_query import FirebaseQuery
+
+
+def test_ids_only_projection_selects_the_document_name():
+    collection_ref = MagicMock()
+
+    FirebaseQuery(Project).select(["id"]).build(collection_ref)
+
+    collection_ref.select.assert_called_once_with(["__name__"])
+
+
+def test_projection_leaves_out_the_document_id():
+    collection_ref = MagicMock()
+
+    FirebaseQuery(Project).select(["id", "name", "name"]).build(collection_ref)
+
+    collection_ref.select.assert_called_once_with(["name"])
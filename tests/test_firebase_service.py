@@ -0,0 +1,68 @@
+from google.cloud.firestore_v1.base_query import FieldFilter
+from common.models.project import Project, Publication, PublicationCreative, PublicationCreativeStatus, PublicationStatus
+from common.services.firebase.firebase_service import FirebaseService
+from common.services.firebase.firebase_write_buffer import FirebaseWriteBuffer
+from common.services.firebase.in_memory_firestore import InMemoryFirestoreClient
+
+
+def in_memory_service(**kwargs) -> FirebaseService:
+    return FirebaseService(api_key="", database_id="", client=InMemoryFirestoreClient(), **kwargs)
+
+
+def test_count_by_counts_documents_at_the_default_value():
+    service = in_memory_service()
+    service.batch_add([
+        PublicationCreative(publication_id="pub-1"),  # status left at its default: not written
+        PublicationCreative(publication_id="pub-1", status=PublicationCreativeStatus.new),
+        PublicationCreative(publication_id="pub-1", status=PublicationCreativeStatus.done),
+        PublicationCreative(publication_id="pub-2", status=PublicationCreativeStatus.done),
+    ])
+
+    counts = service.count_by(
+        PublicationCreative, "status", list(PublicationCreativeStatus), [FieldFilter("publication_id", "==", "pub-1")]
+    )
+
+    assert counts[PublicationCreativeStatus.new] == 2
+    assert counts[PublicationCreativeStatus.done] == 1
+    publication = Publication.model_construct(id="pub-1")
+    status = PublicationStatus.from_counts(publication, counts)
+    assert status.creatives_total == 3
+    assert status.creatives_ready == 1
+
+
+def test_ids_only_fetch_reads_no_fields():
+    service = in_memory_service()
+    project = service.add(Project(name="Trailer", user_id="user-1"))
+
+    projects = service.fetch_all(Project, fields=["id"])
+
+    assert [project.id for project in projects] == [project.id]
+    assert projects[0].model_fields_set == {"id"}
+
+
+def test_buffered_update_of_a_tracked_object_does_not_create_a_missing_document():
+    service = in_memory_service(track_changes=True, write_buffer=FirebaseWriteBuffer(flush_interval=0))
+    kept, deleted = service.batch_add([PublicationCreative(file_name="kept.mp4"), PublicationCreative(file_name="deleted.mp4")])
+    kept, deleted = service.fetch_by_id(PublicationCreative, kept.id), service.fetch_by_id(PublicationCreative, deleted.id)
+    service.delete(PublicationCreative, deleted.id)
+
+    kept.status = PublicationCreativeStatus.done
+    deleted.status = PublicationCreativeStatus.done
+    service.update(kept.id, kept)
+    service.update(deleted.id, deleted)
+    service.flush()
+
+    stored = service.db.collection("creatives").document(kept.id).get().to_dict()
+    assert stored["status"] == PublicationCreativeStatus.done.value
+    assert stored["updated_at"] is not None
+    assert service.fetch_by_id(PublicationCreative, deleted.id) is None
+    assert len(service.write_buffer) == 0
+
+
+def test_buffered_update_of_an_untracked_object_merges_like_an_unbuffered_one():
+    service = in_memory_service(write_buffer=FirebaseWriteBuffer(flush_interval=0))
+
+    service.update("new-id", Project(name="Created"))
+    service.flush()
+
+    assert service.fetch_by_id(Project, "new-id").name == "Created"
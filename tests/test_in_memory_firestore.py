@@ -0,0 +1,77 @@
+import pytest
+from google.api_core.exceptions import NotFound
+from google.cloud.firestore_v1 import DELETE_FIELD, SERVER_TIMESTAMP
+from google.cloud.firestore_v1.base_query import FieldFilter
+from google.cloud.firestore_v1.field_path import FieldPath
+from common.services.firebase.in_memory_firestore import InMemoryFirestoreClient
+
+
+def test_empty_select_returns_full_documents():
+    client = InMemoryFirestoreClient()
+    client.collection("items").document("a").set({"name": "A", "size": 1})
+
+    assert [doc.to_dict() for doc in client.collection("items").select([]).stream()] == [{"name": "A", "size": 1}]
+    assert [doc.to_dict() for doc in client.collection("items").select(["__name__"]).stream()] == [{}]
+    assert [doc.to_dict() for doc in client.collection("items").select(["size"]).stream()] == [{"size": 1}]
+
+
+def test_writes_resolve_sentinels_and_merge_field_paths():
+    client = InMemoryFirestoreClient()
+    reference = client.collection("items").document("a")
+    reference.set({"name": "A", "meta": {"x": 1, "y": 2}})
+
+    reference.set({"meta": {"x": 5}, "name": "ignored"}, merge=[FieldPath("meta", "x")])
+    reference.update({"meta.y": DELETE_FIELD, "updated_at": SERVER_TIMESTAMP})
+
+    data = reference.get().to_dict()
+    assert data["name"] == "A"
+    assert data["meta"] == {"x": 5}
+    assert data["updated_at"] is not None
+
+
+def test_update_of_a_missing_document_fails():
+    client = InMemoryFirestoreClient()
+
+    with pytest.raises(NotFound):
+        client.collection("items").document("missing").update({"name": "A"})
+    assert not client.collection("items").document("missing").get().exists
+
+
+def test_failed_batch_leaves_every_document_unchanged():
+    client = InMemoryFirestoreClient()
+    items = client.collection("items")
+    items.document("a").set({"name": "A"})
+
+    batch = client.batch()
+    batch.set(items.document("a"), {"name": "B"})
+    batch.update(items.document("missing"), {"name": "C"})
+    with pytest.raises(NotFound):
+        batch.commit()
+
+    assert items.document("a").get().to_dict() == {"name": "A"}
+
+
+def test_queries_filter_order_and_page():
+    client = InMemoryFirestoreClient()
+    items = client.collection("items")
+    for doc_id, size in [("a", 3), ("b", 1), ("c", 2), ("d", 5)]:
+        items.document(doc_id).set({"size": size})
+
+    query = items.where(filter=FieldFilter("size", ">", 1)).order_by("size")
+
+    assert [doc.id for doc in query.stream()] == ["c", "a", "d"]
+    assert [doc.id for doc in query.start_after([2]).limit(1).stream()] == ["a"]
+    assert [doc.id for doc in query.limit_to_last(2).get()] == ["a", "d"]
+    assert query.count().get()[0][0].value == 3
+
+
+@pytest.mark.parametrize("use", [
+    lambda client: client.transaction(),
+    lambda client: client.bulk_writer(),
+    lambda client: client.collection_group("items"),
+    lambda client: client.collection("items").on_snapshot(print),
+    lambda client: client.collection("items").document("a").on_snapshot(print),
+])
+def test_unsupported_features_are_rejected(use):
+    with pytest.raises(NotImplementedError):
+        use(InMemoryFirestoreClient())
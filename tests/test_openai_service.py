@@ -0,0 +1,81 @@
+import asyncio
+import itertools
+from unittest import mock
+from common.models.project import Script
+from common.services.firebase.async_firebase_service import AsyncFirebaseService
+from common.services.firebase.firebase_service import FirebaseService
+from common.services.firebase.in_memory_firestore import InMemoryFirestoreClient
+from common.services.openai.openai_service import OpenAIService
+
+
+def source_script() -> Script:
+    return Script(user_id="user-1", project_id="project-1", name="Intro", language="en", content="Hello")
+
+
+def translating_service() -> OpenAIService:
+    service = OpenAIService(api_key="test")
+
+    async def translate_script(content, target_language, chunk_tokens=None):
+        return f"{content} ({target_language})"
+
+    service.translate_script = translate_script
+    return service
+
+
+def async_firebase_service() -> AsyncFirebaseService:
+    service = AsyncFirebaseService(api_key="", database_id="")
+    ids = itertools.count()
+    service._db = mock.MagicMock()
+    service._db.collection.return_value.document.side_effect = lambda: mock.MagicMock(id=f"doc-{next(ids)}")
+    service._db.batch.return_value.commit = mock.AsyncMock()
+    return service
+
+
+def test_translate_script_many_persists_with_async_service():
+    firebase_service = async_firebase_service()
+
+    results = asyncio.run(translating_service().translate_script_many(
+        "Hello", ["de", "fr"], firebase_service=firebase_service, script=source_script()
+    ))
+
+    firebase_service._db.batch.return_value.commit.assert_awaited_once()
+    assert [result.text for result in results.values()] == ["Hello (de)", "Hello (fr)"]
+    assert all(result.script_id and result.error is None for result in results.values())
+
+
+def test_translate_script_many_records_async_save_failure():
+    firebase_service = async_firebase_service()
+    firebase_service._db.batch.return_value.commit.side_effect = RuntimeError("unavailable")
+
+    results = asyncio.run(translating_service().translate_script_many(
+        "Hello", ["de"], firebase_service=firebase_service, script=source_script()
+    ))
+
+    assert results["de"].text == "Hello (de)"
+    assert results["de"].script_id is None
+    assert "unavailable" in results["de"].error
+
+
+def test_translate_script_many_persists_with_sync_service():
+    client = InMemoryFirestoreClient()
+    firebase_service = FirebaseService(api_key="", database_id="", client=client)
+
+    results = asyncio.run(translating_service().translate_script_many(
+        "Hello", ["de"], firebase_service=firebase_service, script=source_script()
+    ))
+
+    stored = client.collections[Script.collection_name()][results["de"].script_id]
+    assert stored["content"] == "Hello (de)"
+
+
+def test_translate_script_many_requires_source_script():
+    service = translating_service()
+    service.translate_script = mock.AsyncMock()
+
+    try:
+        asyncio.run(service.translate_script_many("Hello", ["de"], firebase_service=async_firebase_service()))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("ValueError expected")
+    service.translate_script.assert_not_called()